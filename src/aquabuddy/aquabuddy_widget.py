@@ -3,7 +3,13 @@ from PySide6 import QtCore, QtWidgets, QtGui
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                               QPushButton, QLabel, QLineEdit, QTextEdit,
                               QCheckBox, QRadioButton, QComboBox, QListWidget,
-                              QSlider, QProgressBar, QMessageBox, QTabWidget)
+                              QSlider, QProgressBar, QMessageBox)
+
+from common import perf
+from common.lazy_tabs import LazyTabWidget
+from common.perf_overlay import PerfOverlay
+from drawing_scene import RetainedScene, SceneItem
+from aquadbuddy_mouse_event import MouseTracker
 
 class Aquabuddy(QtWidgets.QWidget):
     def __init__(self, params):
@@ -12,12 +18,13 @@ class Aquabuddy(QtWidgets.QWidget):
         self.hello = "Hallo Welt"
         self.setMouseTracking(False)
 
-        self.tabs = QTabWidget()
-        self.tabs.addTab(self.create_button_example(), "Buttons")
-        self.tabs.addTab(self.create_text_example(), "Text Inputs")
-        self.tabs.addTab(self.create_selection_example(), "Selections")
-        self.tabs.addTab(self.create_slider_example(), "Sliders")
-        self.tabs.addTab(self.create_drawing_example(), "Drawing")
+        # pages are built when first opened – only "Buttons" exists before the window shows
+        self.tabs = LazyTabWidget()
+        self.tabs.add_lazy_tab(self.create_button_example, "Buttons")
+        self.tabs.add_lazy_tab(self.create_text_example, "Text Inputs")
+        self.tabs.add_lazy_tab(self.create_selection_example, "Selections")
+        self.tabs.add_lazy_tab(self.create_slider_example, "Sliders")
+        self.tabs.add_lazy_tab(self.create_drawing_example, "Drawing")
 
         self.button = QtWidgets.QPushButton("Click me!")
         self.text = QtWidgets.QLabel(self.hello,
@@ -30,12 +37,14 @@ class Aquabuddy(QtWidgets.QWidget):
 
 
         self.button.clicked.connect(self.magic)
-    
-    def mousePressEvent(self, mouse_event):
-        print(mouse_event.x())
 
-    def mouseMoveEvent(self, QMouseEvent):
-        print("Hey")
+        # pointer input is compressed to one update per frame
+        self.mouse = MouseTracker(self)
+        self.mouse.gesture.connect(self._on_gesture)
+        self.perf_overlay = PerfOverlay(self, count_paints=True)
+
+    def _on_gesture(self, kind, pos, vx, vy):
+        self.text.setText(f"{kind} at ({pos.x():.0f}, {pos.y():.0f})")
 
     def magic(self):
         if len(self.params) >= 2:
@@ -178,30 +187,68 @@ class DrawingWidget(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.setMinimumSize(400, 300)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_OpaquePaintEvent)  # the scene paints every exposed pixel
         self.rect_offset = 0
 
-    def update_offset(self):
-        self.rect_offset = (self.rect_offset + 10) % 100
-        self.update()  # Trigger repaint
-
-    def paintEvent(self, event):
-        super().paintEvent(event)  # Fills background (optional, remove if unwanted)
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-    
-        # Set up pen (outline) and brush (fill)
+        # Set up pen (outline) and brush (fill) once – shared by all items
         pen = QtGui.QPen()
         pen.setColor(QtCore.Qt.GlobalColor.black)  # Outline color
         pen.setWidth(2)  # Thicker lines reduce "white halo"
-        painter.setPen(pen)
-    
         my_brush = QtGui.QBrush()
         my_brush.setColor(QtCore.Qt.GlobalColor.red)  # Fix: Use QtCore, not QtGui
         my_brush.setStyle(QtCore.Qt.BrushStyle.SolidPattern)
-        painter.setBrush(my_brush)
-    
-        # Draw shapes
-        painter.drawRect(50 + self.rect_offset, 50, 100, 80)
-        painter.drawLine(200, 50, 300, 150)
-        painter.drawEllipse(100, 200, 80, 80)
-        painter.drawText(10, 20, "Drawing Primitives:")
\ No newline at end of file
+        self.pen, self.brush = pen, my_brush
+
+        # Shapes
+        self.scene = RetainedScene()
+        self.scene.set_background(self.palette().color(QtGui.QPalette.ColorRole.Window))
+        self.moving_rect = self.scene.add(SceneItem("rect", QtCore.QRectF(50, 50, 100, 80), pen, my_brush,
+                                                    static=False, antialias=False))
+        self.scene.add(SceneItem("line", QtCore.QLineF(200, 50, 300, 150), pen))
+        self.scene.add(SceneItem("ellipse", QtCore.QRectF(100, 200, 80, 80), pen, my_brush))
+        label = "Drawing Primitives:"
+        text_rect = QtCore.QRectF(self.fontMetrics().boundingRect(label)).translated(10, 20)  # baseline at y=20
+        self.scene.add(SceneItem("text", text_rect, pen, text=label))
+
+        # Dragging: dynamic items are hit targets, moves arrive once per frame
+        self.mouse = MouseTracker(self)
+        self.mouse.add_target(self.moving_rect, self.moving_rect.bounds())
+        self.mouse.pressed.connect(self._on_pressed)
+        self.mouse.moved.connect(self._on_dragged)
+        self.mouse.released.connect(self._on_released)
+        self._drag_item: SceneItem | None = None
+        self._drag_last: QtCore.QPointF | None = None
+
+    def _on_pressed(self, pos, target):
+        self._drag_item, self._drag_last = target, pos
+
+    def _on_dragged(self, pos, vx, vy):
+        if self._drag_item is None:
+            return
+        delta = pos - self._drag_last
+        self._drag_last = pos
+        self.update(self.scene.move_by([(self._drag_item, delta.x(), delta.y())]))
+        self.mouse.move_target(self._drag_item, self._drag_item.bounds())
+
+    def _on_released(self, pos, target):
+        self._drag_item = None
+
+    def update_offset(self):
+        self.rect_offset = (self.rect_offset + 10) % 100
+        dirty = self.scene.move_to(self.moving_rect, QtCore.QPointF(50 + self.rect_offset, 50))
+        self.mouse.move_target(self.moving_rect, self.moving_rect.bounds())
+        self.update(dirty)  # Repaint only where the rectangle was and is now
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.scene.invalidate_static()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.Type.PaletteChange:
+            self.scene.set_background(self.palette().color(QtGui.QPalette.ColorRole.Window))
+
+    @perf.timed("drawing paint", "render")
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        self.scene.paint(painter, event.rect(), self.size(), self.devicePixelRatioF())
@@ -1,3 +1,196 @@
+import time
 from PySide6 import QtCore
 
-class MouseTracker(QMouseEvent)
\ No newline at end of file
+
+class PointerRingBuffer:
+    """Fixed-size history of pointer positions for velocity and gesture math.
+
+    Storage is preallocated; pushing a sample overwrites the oldest one and
+    never allocates, so it is safe to feed from every raw move event.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._cap = capacity
+        self._x = [0.0] * capacity
+        self._y = [0.0] * capacity
+        self._t = [0.0] * capacity
+        self._head = 0  # next write slot
+        self._size = 0
+
+    def clear(self) -> None:
+        self._head = self._size = 0
+
+    def push(self, x: float, y: float, t: float) -> None:
+        i = self._head
+        self._x[i], self._y[i], self._t[i] = x, y, t
+        self._head = (i + 1) % self._cap
+        self._size = min(self._size + 1, self._cap)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _index(self, age: int) -> int:
+        """Slot of the sample ``age`` steps back (0 = newest)."""
+        return (self._head - 1 - age) % self._cap
+
+    def newest(self) -> tuple[float, float, float] | None:
+        if not self._size:
+            return None
+        i = self._index(0)
+        return self._x[i], self._y[i], self._t[i]
+
+    def velocity(self, window: float = 0.1) -> tuple[float, float]:
+        """Pixels per second over the last ``window`` seconds of samples."""
+        if self._size < 2:
+            return 0.0, 0.0
+        new = self._index(0)
+        old = new
+        for age in range(1, self._size):
+            i = self._index(age)
+            if self._t[new] - self._t[i] > window:
+                break
+            old = i
+        dt = self._t[new] - self._t[old]
+        if dt <= 0:
+            return 0.0, 0.0
+        return (self._x[new] - self._x[old]) / dt, (self._y[new] - self._y[old]) / dt
+
+
+class SpatialHash:
+    """Uniform grid mapping cells to hit targets.
+
+    A hit test only looks at the targets registered in the cell under the
+    point instead of walking every target.
+    """
+
+    def __init__(self, cell_size: int = 64):
+        self._cell = cell_size
+        self._cells: dict[tuple[int, int], list] = {}
+        self._rects: dict = {}
+
+    def _cells_for(self, rect: QtCore.QRect):
+        c = self._cell
+        for cx in range(rect.left() // c, rect.right() // c + 1):
+            for cy in range(rect.top() // c, rect.bottom() // c + 1):
+                yield cx, cy
+
+    def insert(self, key, rect: QtCore.QRect) -> None:
+        if key in self._rects:
+            self.remove(key)
+        self._rects[key] = QtCore.QRect(rect)
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, []).append(key)
+
+    def remove(self, key) -> None:
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cells_for(rect):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.remove(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def update(self, key, rect: QtCore.QRect) -> None:
+        self.insert(key, rect)
+
+    def hit_test(self, point: QtCore.QPoint) -> list:
+        """Targets containing ``point``, topmost (last inserted) first."""
+        bucket = self._cells.get((point.x() // self._cell, point.y() // self._cell), ())
+        return [key for key in reversed(bucket) if self._rects[key].contains(point)]
+
+
+class MouseTracker(QtCore.QObject):
+    """Event filter that turns raw mouse events into frame-rate pointer updates.
+
+    Move events are only recorded when they arrive; ``moved`` fires at most
+    once per ``frame_ms`` with the latest position and the current velocity.
+    Presses are hit-tested against the registered targets through a
+    SpatialHash, and releases are classified as "click", "drag" or "flick".
+    """
+
+    moved = QtCore.Signal(QtCore.QPointF, float, float)  # pos, vx, vy (px/s)
+    pressed = QtCore.Signal(QtCore.QPointF, object)  # pos, topmost target or None
+    released = QtCore.Signal(QtCore.QPointF, object)
+    gesture = QtCore.Signal(str, QtCore.QPointF, float, float)
+
+    click_distance = 4.0  # px
+    click_time = 0.3  # s
+    flick_speed = 1200.0  # px/s
+
+    def __init__(self, widget, frame_ms: int = 16, cell_size: int = 64):
+        super().__init__(widget)
+        self.history = PointerRingBuffer()
+        self.targets = SpatialHash(cell_size)
+        self._latest: QtCore.QPointF | None = None
+        self._press_pos: QtCore.QPointF | None = None
+        self._press_time = 0.0
+        self._press_target = None
+
+        self._frame = QtCore.QTimer(self)
+        self._frame.setSingleShot(True)
+        self._frame.setInterval(frame_ms)
+        self._frame.timeout.connect(self._flush_move)
+        widget.installEventFilter(self)
+
+    # ------------------------------------------------------------------ targets
+    def add_target(self, key, rect: QtCore.QRect) -> None:
+        self.targets.insert(key, rect)
+
+    def move_target(self, key, rect: QtCore.QRect) -> None:
+        self.targets.update(key, rect)
+
+    def remove_target(self, key) -> None:
+        self.targets.remove(key)
+
+    def target_at(self, pos: QtCore.QPointF):
+        hits = self.targets.hit_test(pos.toPoint())
+        return hits[0] if hits else None
+
+    # ------------------------------------------------------------------ events
+    def eventFilter(self, obj, event):
+        etype = event.type()
+        if etype == QtCore.QEvent.Type.MouseMove:
+            pos = event.position()
+            self.history.push(pos.x(), pos.y(), time.perf_counter())
+            self._latest = pos
+            if not self._frame.isActive():
+                self._frame.start()
+        elif etype == QtCore.QEvent.Type.MouseButtonPress:
+            pos = event.position()
+            self.history.clear()
+            self.history.push(pos.x(), pos.y(), time.perf_counter())
+            self._press_pos, self._press_time = pos, time.perf_counter()
+            self._press_target = self.target_at(pos)
+            self.pressed.emit(pos, self._press_target)
+        elif etype == QtCore.QEvent.Type.MouseButtonRelease:
+            pos = event.position()
+            self.history.push(pos.x(), pos.y(), time.perf_counter())
+            self._flush_move()
+            self.released.emit(pos, self._press_target)
+            self._emit_gesture(pos)
+        return False  # observe only, the widget still gets its events
+
+    def _flush_move(self) -> None:
+        self._frame.stop()
+        if self._latest is None:
+            return
+        vx, vy = self.history.velocity()
+        pos, self._latest = self._latest, None
+        self.moved.emit(pos, vx, vy)
+
+    def _emit_gesture(self, pos: QtCore.QPointF) -> None:
+        if self._press_pos is None:
+            return
+        vx, vy = self.history.velocity()
+        delta = pos - self._press_pos
+        distance = (delta.x() ** 2 + delta.y() ** 2) ** 0.5
+        if distance <= self.click_distance and time.perf_counter() - self._press_time <= self.click_time:
+            kind = "click"
+        elif (vx * vx + vy * vy) ** 0.5 >= self.flick_speed:
+            kind = "flick"
+        else:
+            kind = "drag"
+        self._press_pos = None
+        self.gesture.emit(kind, pos, vx, vy)
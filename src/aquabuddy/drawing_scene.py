@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from PySide6 import QtCore, QtGui
+
+
+@dataclass(slots=True, eq=False)
+class SceneItem:
+    """One primitive of a RetainedScene.
+
+    ``kind`` is "rect", "ellipse", "line" or "text".  ``geometry`` is a
+    QRectF for rect/ellipse/text (text is drawn vertically centred in its
+    rect) and a QLineF for lines.  Pens and brushes are shared objects,
+    nothing is created per paint.
+    """
+
+    kind: str
+    geometry: QtCore.QRectF | QtCore.QLineF
+    pen: QtGui.QPen
+    brush: QtGui.QBrush | None = None
+    text: str = ""
+    static: bool = True
+    antialias: bool = True
+
+    def bounds(self) -> QtCore.QRect:
+        """Device rect covered by the item, including pen width and AA fringe."""
+        if self.kind == "line":
+            rect = QtCore.QRectF(self.geometry.p1(), self.geometry.p2()).normalized()
+        else:
+            rect = self.geometry
+        grow = self.pen.widthF() / 2 + 1
+        return rect.adjusted(-grow, -grow, grow, grow).toAlignedRect()
+
+    def draw(self, painter: QtGui.QPainter) -> None:
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing, self.antialias)
+        painter.setPen(self.pen)
+        painter.setBrush(self.brush if self.brush is not None else QtCore.Qt.BrushStyle.NoBrush)
+        if self.kind == "rect":
+            painter.drawRect(self.geometry)
+        elif self.kind == "ellipse":
+            painter.drawEllipse(self.geometry)
+        elif self.kind == "line":
+            painter.drawLine(self.geometry)
+        elif self.kind == "text":
+            painter.drawText(self.geometry, QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter,
+                             self.text)
+
+
+class RetainedScene:
+    """Keeps primitives between paints and only redraws what changed.
+
+    Static items are rasterised once into a QPixmap layer; a paint event
+    blits the exposed part of that layer and draws just the dynamic items
+    that intersect the exposed rect.  Moving an item returns the old and
+    new bounds so the widget can invalidate exactly that region.
+    """
+
+    def __init__(self):
+        self.items: list[SceneItem] = []
+        self._static_layer: QtGui.QPixmap | None = None
+        self._background = QtGui.QColor(QtCore.Qt.GlobalColor.transparent)
+
+    def add(self, item: SceneItem) -> SceneItem:
+        self.items.append(item)
+        if item.static:
+            self._static_layer = None
+        return item
+
+    def set_background(self, color: QtGui.QColor) -> None:
+        self._background = QtGui.QColor(color)
+        self._static_layer = None
+
+    def invalidate_static(self) -> None:
+        self._static_layer = None
+
+    # ------------------------------------------------------------------ updates
+    def move_to(self, item: SceneItem, pos: QtCore.QPointF) -> QtCore.QRect:
+        """Move an item's top-left (or first point) to ``pos``; returns the dirty rect."""
+        before = item.bounds()
+        if item.kind == "line":
+            item.geometry.translate(pos - item.geometry.p1())
+        else:
+            item.geometry.moveTopLeft(pos)
+        if item.static:
+            self._static_layer = None
+        return before.united(item.bounds())
+
+    def move_by(self, moves: list[tuple[SceneItem, float, float]]) -> QtGui.QRegion:
+        """Translate many items at once and collect their dirty region."""
+        dirty = QtGui.QRegion()
+        for item, dx, dy in moves:
+            before = item.bounds()
+            item.geometry.translate(dx, dy)
+            dirty += before.united(item.bounds())
+            if item.static:
+                self._static_layer = None
+        return dirty
+
+    # ------------------------------------------------------------------ painting
+    def _render_static(self, size: QtCore.QSize, dpr: float) -> QtGui.QPixmap:
+        layer = QtGui.QPixmap(size * dpr)
+        layer.setDevicePixelRatio(dpr)
+        layer.fill(self._background)
+        painter = QtGui.QPainter(layer)
+        for item in self.items:
+            if item.static:
+                item.draw(painter)
+        painter.end()
+        return layer
+
+    def paint(self, painter: QtGui.QPainter, exposed: QtCore.QRect, size: QtCore.QSize, dpr: float) -> None:
+        layer = self._static_layer
+        if layer is None or layer.deviceIndependentSize().toSize() != size or layer.devicePixelRatio() != dpr:
+            layer = self._static_layer = self._render_static(size, dpr)
+
+        painter.setClipRect(exposed)
+        source = QtCore.QRectF(exposed.x() * dpr, exposed.y() * dpr, exposed.width() * dpr, exposed.height() * dpr)
+        painter.drawPixmap(QtCore.QRectF(exposed), layer, source)
+        for item in self.items:
+            if not item.static and item.bounds().intersects(exposed):
+                item.draw(painter)
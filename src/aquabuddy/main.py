@@ -1,27 +1,74 @@
 import sys, time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # entry script: put src/ on the path so every module finds common
+from common import perf
+from common.perf_overlay import PerfOverlay
+from common.startup import StartupTimer
+startup = StartupTimer("aquabuddy")
+
 from PySide6.QtWidgets import QApplication, QMainWindow
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
-from PySide6.QtCore    import QTimer, Qt
+from PySide6.QtCore    import QTimer
 from PySide6.QtGui     import QSurfaceFormat
 
-from OpenGL.GL import *
-from PIL import Image
+gl = None  # OpenGL.GL – slow to import, loaded when the first GL context comes up
+QUERY_RING = 3  # GPU timings are read back this many frames late, when they are long finished
+
+
+def _load_gl():
+    global gl
+    if gl is None:
+        from OpenGL import GL
+        gl = GL
+    return gl
+
 
 class GLWaterWidget(QOpenGLWidget):
-    def __init__(self, parent=None):
+    """Water background rendered offscreen at a fraction of the window size.
+
+    The shader runs into a small framebuffer (``render_scale`` × window
+    pixels), which is then stretched onto the window with a linear blit.
+    With ``auto_scale`` the scale drops whenever that work takes the GPU
+    longer than ``frame_budget`` (measured with timer queries, so the
+    16 ms repaint timer does not count) and climbs back once the next
+    larger scale would fit again.
+    """
+
+    MIN_SCALE = 0.25
+    MAX_SCALE = 1.0
+
+    def __init__(self, parent=None, render_scale: float = 0.5, auto_scale: bool = True,
+                 frame_budget: float = 1 / 60):
         fmt = QSurfaceFormat()
         fmt.setVersion(3, 3)
         fmt.setProfile(QSurfaceFormat.CoreProfile)
         QSurfaceFormat.setDefaultFormat(fmt)
         super().__init__(parent)
         self._start = time.time()
+        self.render_scale = min(max(render_scale, self.MIN_SCALE), self.MAX_SCALE)
+        self.auto_scale = auto_scale
+        self.frame_budget = frame_budget
+
+        # offscreen target, (re)created lazily when size or scale changes
+        self._fbo = 0
+        self._fbo_tex = 0
+        self._fbo_size = (0, 0)
+
+        # GPU time of the water pass and blit, for the automatic scale
+        self._queries: list[int] = []
+        self._query_frame = 0
+        self._avg_gpu = 0.0
+        self._frames_since_change = 0
+
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update)  # triggers paintGL
         self.timer.start(16)  # ~60 FPS
+        self.perf_overlay = PerfOverlay(self)
 
     def initializeGL(self):
+        _load_gl()
+        startup.mark("GL loaded")
         # compile shader
         with open(Path(__file__).parent / "assets/shaders/water.frag") as f:
             frag_src = f.read()
@@ -34,60 +81,128 @@ class GLWaterWidget(QOpenGLWidget):
             gl_Position = vec4(aPos * 2.0 - 1.0, 0.0, 1.0);
         }
         """
-        self.prog = glCreateProgram()
-        for src, typ in [(vert_src, GL_VERTEX_SHADER),(frag_src, GL_FRAGMENT_SHADER)]:
-            sh = glCreateShader(typ)
-            glShaderSource(sh, src)
-            glCompileShader(sh)
-            if not glGetShaderiv(sh, GL_COMPILE_STATUS):
-                raise RuntimeError(glGetShaderInfoLog(sh).decode())
-            glAttachShader(self.prog, sh)
-        glLinkProgram(self.prog)
+        self.prog = gl.glCreateProgram()
+        for src, typ in [(vert_src, gl.GL_VERTEX_SHADER),(frag_src, gl.GL_FRAGMENT_SHADER)]:
+            sh = gl.glCreateShader(typ)
+            gl.glShaderSource(sh, src)
+            gl.glCompileShader(sh)
+            if not gl.glGetShaderiv(sh, gl.GL_COMPILE_STATUS):
+                raise RuntimeError(gl.glGetShaderInfoLog(sh).decode())
+            gl.glAttachShader(self.prog, sh)
+        gl.glLinkProgram(self.prog)
+        self.loc_time = gl.glGetUniformLocation(self.prog, "u_time")
+        self.loc_res  = gl.glGetUniformLocation(self.prog, "u_resolution")
 
         # quad covering [0,1]×[0,1]
-        self.vao = glGenVertexArrays(1)
-        glBindVertexArray(self.vao)
+        self.vao = gl.glGenVertexArrays(1)
+        gl.glBindVertexArray(self.vao)
         verts = [-1, -1, 1, -1, 1, 1, -1, 1]
-        self.vbo = glGenBuffers(1)
-        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
-        glBufferData(GL_ARRAY_BUFFER, (GLfloat * len(verts))(*verts), GL_STATIC_DRAW)
-        glEnableVertexAttribArray(0)
-        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, None)
+        self.vbo = gl.glGenBuffers(1)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, self.vbo)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, (gl.GLfloat * len(verts))(*verts), gl.GL_STATIC_DRAW)
+        gl.glEnableVertexAttribArray(0)
+        gl.glVertexAttribPointer(0, 2, gl.GL_FLOAT, gl.GL_FALSE, 0, None)
+
+        self._queries = [int(q) for q in gl.glGenQueries(QUERY_RING)]
+        self._query_frame = 0
+        self.context().aboutToBeDestroyed.connect(self._cleanup_gl)
 
+    # ------------------------------------------------------------------ offscreen target
+    def _pixel_size(self) -> tuple[int, int]:
+        dpr = self.devicePixelRatioF()
+        return max(1, int(self.width() * dpr)), max(1, int(self.height() * dpr))
+
+    def _ensure_fbo(self, w: int, h: int) -> None:
+        if self._fbo and self._fbo_size == (w, h):
+            return
+        self._release_fbo()
+
+        self._fbo_tex = gl.glGenTextures(1)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self._fbo_tex)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA8, w, h, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+        self._fbo = gl.glGenFramebuffers(1)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self._fbo)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, self._fbo_tex, 0)
+        if gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER) != gl.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Offscreen water framebuffer is incomplete")
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.defaultFramebufferObject())
+        self._fbo_size = (w, h)
+
+    def _release_fbo(self) -> None:
+        if self._fbo:
+            gl.glDeleteFramebuffers(1, [self._fbo])
+            gl.glDeleteTextures(1, [self._fbo_tex])
+        self._fbo = self._fbo_tex = 0
+        self._fbo_size = (0, 0)
+
+    def set_render_scale(self, scale: float) -> None:
+        """Change the water resolution; the framebuffer is rebuilt on the next frame."""
+        self.render_scale = min(max(scale, self.MIN_SCALE), self.MAX_SCALE)
+        self._frames_since_change = 0
+
+    def _adapt_scale(self, gpu_time: float) -> None:
+        """Lower the scale when over budget, raise it again once the larger scale would fit."""
+        self._avg_gpu += (gpu_time - self._avg_gpu) * 0.1  # EMA keeps single hitches out
+        self._frames_since_change += 1
+        if not self.auto_scale or self._frames_since_change < 30:
+            return
+
+        if self._avg_gpu > self.frame_budget and self.render_scale > self.MIN_SCALE:
+            self.set_render_scale(self.render_scale * 0.75)
+        elif self._avg_gpu * 1.25 ** 2 < self.frame_budget * 0.8 and self.render_scale < self.MAX_SCALE \
+                and self._frames_since_change > 240:
+            self.set_render_scale(self.render_scale * 1.25)  # cost grows with the pixel count
+
+    # ------------------------------------------------------------------ drawing
+    @perf.timed("paintGL", "render")
     def paintGL(self):
+        perf.frame()
+        query = self._queries[self._query_frame % QUERY_RING]
+        if self._query_frame >= QUERY_RING:
+            elapsed = (gl.GLuint64 * 1)()
+            gl.glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, elapsed)  # nanoseconds, QUERY_RING frames ago
+            self._adapt_scale(elapsed[0] / 1e9)
+        self._query_frame += 1
         now = time.time() - self._start
-        w, h = self.width(), self.height()
-        glViewport(0, 0, w, h)
-        glClear(GL_COLOR_BUFFER_BIT)
-
-        # draw water
-        glUseProgram(self.prog)
-        loc_time = glGetUniformLocation(self.prog, "u_time")
-        loc_res  = glGetUniformLocation(self.prog, "u_resolution")
-        glUniform1f(loc_time, now)
-        glUniform2f(loc_res, w, h)
-        glBindVertexArray(self.vao)
-        glDrawArrays(GL_TRIANGLE_FAN, 0, 4)
-
-        # # draw fish sprite on top
-        # glEnable(GL_TEXTURE_2D)
-        # glBindTexture(GL_TEXTURE_2D, self.tex_fish)
-        # glBegin(GL_QUADS)
-        # # center it, quarter-screen size
-        # fw, fh = w * 0.25, h * 0.25
-        # cx, cy = w*0.5, h*0.5
-        # for dx, dy, sx, sy in [
-        #     (-fw, -fh, 0, 0), ( fw, -fh, 1, 0),
-        #     ( fw,  fh, 1, 1), (-fw,  fh, 0, 1),
-        # ]:
-        #     glTexCoord2f(sx, sy)
-        #     glVertex2f(cx+dx, cy+dy)
-        # glEnd()
-        # glDisable(GL_TEXTURE_2D)
+        w, h = self._pixel_size()
+        sw, sh = max(1, int(w * self.render_scale)), max(1, int(h * self.render_scale))
+        self._ensure_fbo(sw, sh)
+
+        # 1) water into the low-res target
+        gl.glBeginQuery(gl.GL_TIME_ELAPSED, query)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self._fbo)
+        gl.glViewport(0, 0, sw, sh)
+        gl.glUseProgram(self.prog)
+        gl.glUniform1f(self.loc_time, now)
+        gl.glUniform2f(self.loc_res, sw, sh)
+        gl.glBindVertexArray(self.vao)
+        gl.glDrawArrays(gl.GL_TRIANGLE_FAN, 0, 4)
+
+        # 2) upscale onto the widget's framebuffer
+        target = self.defaultFramebufferObject()
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, self._fbo)
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, target)
+        gl.glBlitFramebuffer(0, 0, sw, sh, 0, 0, w, h, gl.GL_COLOR_BUFFER_BIT, gl.GL_LINEAR)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, target)
+        gl.glViewport(0, 0, w, h)
+        gl.glEndQuery(gl.GL_TIME_ELAPSED)
 
     def resizeGL(self, w, h):
-        print("pups")
-        glViewport(0, 0, w, h)
+        perf.count("resizeGL")
+        gl.glViewport(0, 0, w, h)
+        self._frames_since_change = 0  # new size, re-measure before adapting
+
+    def _cleanup_gl(self):
+        self.makeCurrent()
+        self._release_fbo()
+        if self._queries:
+            gl.glDeleteQueries(len(self._queries), self._queries)
+            self._queries = []
+        self.doneCurrent()
 
 
 class MainWindow(QMainWindow):
@@ -98,8 +213,11 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    startup.mark("imports")
     app = QApplication(sys.argv)
     win = MainWindow()
     win.resize(800, 600)
+    startup.mark("window built")
+    startup.watch_first_frame(win.centralWidget())
     win.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
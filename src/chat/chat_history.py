@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+
+@dataclass
+class ChatMessage():
+    text: str
+    outgoing: bool = False
+    timestamp: float = field(default_factory=time.time)
+    msg_id: int | None = None  # row id once the message is stored
+    # layout cache, filled by the delegate for the width it was measured at
+    _height: int = field(default=0, repr=False, compare=False)
+    _natural_width: int = field(default=0, repr=False, compare=False)  # widest wrapped line
+    _height_width: int = field(default=-1, repr=False, compare=False)
+
+
+class ChatHistoryStore:
+    """Append-only message log in SQLite, indexed by (conversation, timestamp).
+
+    Pages are read newest-first with a keyset cursor ``(timestamp, msg_id)``,
+    so fetching a page costs the same whether the conversation holds a
+    hundred or a million messages.  Reads from worker threads get their own
+    short-lived connection; the owning thread keeps one open.
+    """
+
+    DEFAULT_PATH = Path(__file__).parent / "chat_history.sqlite3"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation TEXT    NOT NULL,
+            ts           REAL    NOT NULL,
+            outgoing     INTEGER NOT NULL,
+            text         TEXT    NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_conv_ts ON messages (conversation, ts, id);
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self._path = str(path or self.DEFAULT_PATH)
+        self._owner = threading.get_ident()
+        self._conn = sqlite3.connect(self._path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    @contextmanager
+    def _reader(self):
+        if threading.get_ident() == self._owner:
+            yield self._conn
+            return
+        conn = sqlite3.connect(self._path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ writing
+    def append(self, conversation: str, messages: list[ChatMessage]) -> None:
+        """Store messages in one transaction and fill in their ``msg_id``."""
+        with self._conn:
+            for msg in messages:
+                cur = self._conn.execute(
+                    "INSERT INTO messages (conversation, ts, outgoing, text) VALUES (?, ?, ?, ?)",
+                    (conversation, msg.timestamp, int(msg.outgoing), msg.text),
+                )
+                msg.msg_id = cur.lastrowid
+
+    # ------------------------------------------------------------------ reading
+    def latest_page(self, conversation: str, limit: int = 200) -> list[ChatMessage]:
+        """Newest ``limit`` messages, oldest first."""
+        return self._page(conversation, None, limit)
+
+    def page_before(self, conversation: str, oldest: ChatMessage, limit: int = 200) -> list[ChatMessage]:
+        """Up to ``limit`` messages older than ``oldest``, oldest first."""
+        return self._page(conversation, (oldest.timestamp, oldest.msg_id), limit)
+
+    def _page(self, conversation: str, before: tuple[float, int] | None, limit: int) -> list[ChatMessage]:
+        sql = "SELECT id, ts, outgoing, text FROM messages WHERE conversation = ?"
+        args: list = [conversation]
+        if before is not None:
+            sql += " AND (ts < ? OR (ts = ? AND id < ?))"
+            args += [before[0], before[0], before[1]]
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        args.append(limit)
+        with self._reader() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [ChatMessage(text, bool(out), ts, msg_id) for msg_id, ts, out, text in reversed(rows)]
+
+    def is_empty(self, conversation: str) -> bool:
+        with self._reader() as conn:
+            row = conn.execute("SELECT 1 FROM messages WHERE conversation = ? LIMIT 1", (conversation,)).fetchone()
+        return row is None
+
+    def close(self) -> None:
+        self._conn.close()
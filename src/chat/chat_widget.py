@@ -1,45 +1,322 @@
-from PySide6 import QtCore, QtWidgets
+from PySide6 import QtCore, QtWidgets, QtGui
 from PySide6.QtCore import Qt
 import random
 
-class ChatArea(QtWidgets.QWidget):
+from common import perf
+from common.perf_overlay import PerfOverlay
+
+from chat_history import ChatHistoryStore, ChatMessage
+from text_measure import BlockHeightCache, BubbleMeasureThread, measure_text
+from transport import ChatTransport
+
+
+class HistoryPageLoader(QtCore.QThread):
+    """Fetches one page of older messages off the GUI thread."""
+
+    loaded = QtCore.Signal(list)  # list[ChatMessage], oldest first
+
+    def __init__(self, store: ChatHistoryStore, conversation: str, oldest: ChatMessage, limit: int):
+        super().__init__()
+        self._store = store
+        self._conversation = conversation
+        self._oldest = oldest
+        self._limit = limit
+
+    def run(self) -> None:
+        self.loaded.emit(self._store.page_before(self._conversation, self._oldest, self._limit))
+
+
+class ChatMessageModel(QtCore.QAbstractListModel):
+    """Flat list of ChatMessage rows; the view only ever asks for visible ones."""
+
+    MessageRole = Qt.ItemDataRole.UserRole + 1
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._messages: list[ChatMessage] = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        msg = self._messages[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return msg.text
+        if role == self.MessageRole:
+            return msg
+        return None
+
+    def message_at(self, row: int) -> ChatMessage:
+        return self._messages[row]
+
+    def oldest(self) -> ChatMessage | None:
+        return self._messages[0] if self._messages else None
+
+    def prepend_messages(self, messages: list[ChatMessage]) -> None:
+        if not messages:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), 0, len(messages) - 1)
+        self._messages[:0] = messages
+        self.endInsertRows()
+
+    def append_messages(self, messages: list[ChatMessage]) -> None:
+        if not messages:
+            return
+        first = len(self._messages)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(messages) - 1)
+        self._messages.extend(messages)
+        self.endInsertRows()
+
+
+class ChatBubbleDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints a message as a bubble and measures it only when the view asks.
+
+    Heights and bubble widths are cached on the message itself together with
+    the width they were measured for, so scrolling back over already seen rows is free and
+    a resize simply invalidates the cache lazily.
+    """
+
+    padding = 8
+    margin = 4
+    max_ratio = 0.75  # bubble width relative to the viewport
+
+    def __init__(self, view: QtWidgets.QListView):
+        super().__init__(view)
+        self._view = view
+        self._pen_in = QtGui.QPen(QtGui.QColor("#c8c8c8"))
+        self._pen_out = QtGui.QPen(QtGui.QColor("#7fb27f"))
+        self._brush_in = QtGui.QBrush(QtGui.QColor("#f2f2f2"))
+        self._brush_out = QtGui.QBrush(QtGui.QColor("#dcf8c6"))
+        self._text_pen = QtGui.QPen(QtGui.QColor("#202020"))
+
+    def text_width(self) -> int:
+        width = self._view.viewport().width()
+        return max(40, int(width * self.max_ratio) - 2 * self.padding)
+
+    def extra_height(self) -> int:
+        return 2 * self.padding + 2 * self.margin
+
+    def _measure(self, msg: ChatMessage, font: QtGui.QFont, text_width: int) -> int:
+        if msg._height_width != text_width:
+            perf.count("chat measure")
+            natural, height = measure_text(msg.text, font, text_width)
+            msg._height = height + self.extra_height()
+            msg._natural_width = natural
+            msg._height_width = text_width
+        return msg._height
+
+    def row_height(self, msg: ChatMessage) -> int:
+        return self._measure(msg, self._view.font(), self.text_width())
+
+    def sizeHint(self, option, index):
+        msg = index.model().message_at(index.row())
+        height = self._measure(msg, option.font, self.text_width())
+        return QtCore.QSize(self._view.viewport().width(), height)
+
+    def paint(self, painter, option, index):
+        msg = index.model().message_at(index.row())
+        text_width = self.text_width()
+        bubble_h = self._measure(msg, option.font, text_width) - 2 * self.margin
+        bubble_w = msg._natural_width + 2 * self.padding
+
+        row = option.rect
+        x = row.right() - self.margin - bubble_w if msg.outgoing else row.left() + self.margin
+        bubble = QtCore.QRect(x, row.top() + self.margin, bubble_w, bubble_h)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._pen_out if msg.outgoing else self._pen_in)
+        painter.setBrush(self._brush_out if msg.outgoing else self._brush_in)
+        painter.drawRoundedRect(bubble, 8, 8)
+        painter.setPen(self._text_pen)
+        painter.drawText(bubble.adjusted(self.padding, self.padding, -self.padding, -self.padding),
+                         Qt.TextFlag.TextWordWrap, msg.text)
+        painter.restore()
 
-        self.layout = QtWidgets.QVBoxLayout()
-        self.layout.setAlignment(QtCore.Qt.AlignmentFlag.AlignTop)
+
+class ChatArea(QtWidgets.QListView):
+    """Chat history view backed by a ChatHistoryStore.
+
+    Only the newest page is read at startup; older pages are fetched in a
+    worker thread whenever the user scrolls close to the top.
+    """
+
+    page_size = 200
+
+    def __init__(self, parent=None, store: ChatHistoryStore | None = None, conversation: str = "default"):
+        super().__init__(parent)
         self._text_var = ["Hey Lukas", "HEEEEEEEEY WAS GEHT ALTES HAUS\nSCHON LANG NICHT MEHR GESEHEN HAHAHAH\nLass mal wieder was saufen wie echte männer hahahahahahhahaha\nloremipsum blal bla ich hasse mein leben manchmal nicht hahahahah"]
-        self.chat_widgets = []
-        for i in range(100):
-            chat = QtWidgets.QTextEdit()
-            setattr(self, f'_testchat_{i}', chat)
-            chat.padding = 8.0
-            chat.setText(random.choice(self._text_var))
-            #chat.setFixedHeight(chat.frameWidth() + chat.padding)
-            self.layout.addWidget(chat)
-            self.chat_widgets.append(chat)
-        self.setLayout(self.layout)
-
-    def showEvent(self, event):
-        super().showEvent(event)
-        for i in range(100):
-            self.chat_widgets[i].setFixedHeight(self.chat_widgets[i].document().size().height() + self.chat_widgets[i].padding)
+        self._store = store
+        self._conversation = conversation
+        self._loader: HistoryPageLoader | None = None
+        self._measurer: BubbleMeasureThread | None = None  # started with the first batch to measure
+        QtCore.QCoreApplication.instance().aboutToQuit.connect(self._stop_measurer)
+        self._history_exhausted = store is None
+        self._anchor: tuple[int, int] | None = None  # (row, y) to keep in place while prepended rows are laid out
+
+        self.message_model = ChatMessageModel(self)
+        self.delegate = ChatBubbleDelegate(self)
+        self.setModel(self.message_model)
+        self.setItemDelegate(self.delegate)
+
+        # only visible rows get painted; sizes are measured in small batches
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QtWidgets.QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setResizeMode(QtWidgets.QListView.ResizeMode.Adjust)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.NoSelection)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+        samples = [ChatMessage(random.choice(self._text_var), outgoing=bool(i % 2)) for i in range(100)]
+        if store is None:
+            self.message_model.append_messages(samples)
+        else:
+            if store.is_empty(conversation):
+                store.append(conversation, samples)
+            self.add_messages(store.latest_page(conversation, self.page_size), persist=False)
+            self.verticalScrollBar().valueChanged.connect(self._maybe_backfill)
+            self.verticalScrollBar().rangeChanged.connect(self._on_range_changed)
+
+    def add_messages(self, messages: list[ChatMessage], persist: bool = True) -> None:
+        """Append a batch of messages with a single row insertion."""
+        with perf.scope("chat layout", "chat"):
+            if persist and self._store is not None:
+                self._store.append(self._conversation, messages)
+            at_bottom = self.verticalScrollBar().value() >= self.verticalScrollBar().maximum()
+            self._precompute_heights(messages)
+            self.message_model.append_messages(messages)
+        perf.count("chat messages", len(messages))
+        if at_bottom:
+            # let the view lay out the new rows first, then follow the tail
+            QtCore.QTimer.singleShot(0, self.scrollToBottom)
+
+    # ------------------------------------------------------------------ backfill
+    def _maybe_backfill(self, value: int) -> None:
+        if self._history_exhausted or self._loader is not None or self._anchor is not None:
+            return
+        if value > self.viewport().height():
+            return
+        oldest = self.message_model.oldest()
+        if oldest is None or oldest.msg_id is None:
+            return
+        self._loader = HistoryPageLoader(self._store, self._conversation, oldest, self.page_size)
+        self._loader.loaded.connect(self._backfill_done)
+        self._loader.finished.connect(self._loader_finished)
+        self._loader.start()
+
+    def _fill_viewport(self) -> None:
+        """Backfill while the loaded rows do not fill the viewport (no scrolling, so no valueChanged)."""
+        room = self.viewport().height()
+        for row in reversed(range(self.message_model.rowCount())):
+            room -= self.delegate.row_height(self.message_model.message_at(row))
+            if room < 0:
+                return
+        self._maybe_backfill(0)
+
+    def _loader_finished(self) -> None:
+        # only now has run() returned; dropping the reference earlier would destroy a running QThread
+        self._loader = None
+        self._maybe_backfill(self.verticalScrollBar().value())
+
+    def _backfill_done(self, messages: list[ChatMessage]) -> None:
+        if len(messages) < self.page_size:
+            self._history_exhausted = True
+        if not messages:
+            return
+
+        anchor = self.indexAt(QtCore.QPoint(0, 0))
+        if anchor.isValid() and self.verticalScrollBar().maximum() > 0:
+            # the view lays the rows out again in its own batches; once the row under the top edge
+            # has its new position, scroll by the height inserted above it
+            self._anchor = (anchor.row() + len(messages), self.visualRect(anchor).top())
+            self.viewport().setUpdatesEnabled(False)  # no frame of the new rows at the old offset
+        self._precompute_heights(messages)
+        self.message_model.prepend_messages(messages)
+
+    def _on_range_changed(self, minimum: int, maximum: int) -> None:
+        if self._anchor is not None and self.visualRect(self.message_model.index(self._anchor[0])).isValid():
+            self._restore_scroll()
+
+    def _restore_scroll(self) -> None:
+        (row, y), self._anchor = self._anchor, None
+        rect = self.visualRect(self.message_model.index(row))
+        if rect.isValid():
+            bar = self.verticalScrollBar()
+            bar.setValue(bar.value() + rect.top() - y)
+        self.viewport().setUpdatesEnabled(True)
+        self._maybe_backfill(self.verticalScrollBar().value())
+
+    # ------------------------------------------------------------------ measurement
+    def _precompute_heights(self, messages: list[ChatMessage] | None = None) -> None:
+        """Queue bubbles for measuring in the background at the viewport's current width.
+
+        Without ``messages`` every loaded row is queued, which is what a
+        width change needs.  Until the view is shown its viewport has a
+        placeholder width, so nothing is measured; the first resize queues
+        everything at the real one.
+        """
+        if not self.isVisible():
+            return
+        if self._measurer is None:
+            self._measurer = BubbleMeasureThread(self.font(), self.delegate.extra_height())
+            self._measurer.start(QtCore.QThread.Priority.LowPriority)
+        batch = list(self.message_model._messages if messages is None else messages)
+        self._measurer.measure(batch, self.delegate.text_width())
+
+    def _stop_measurer(self) -> None:
+        if self._measurer is not None:
+            self._measurer.stop()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._anchor is not None:
+            self._restore_scroll()  # never leave the viewport frozen, even if the layout is not done yet
+        if event.size().width() != event.oldSize().width():
+            self._precompute_heights()
+        self._fill_viewport()
 
 
 class InputTextField(QtWidgets.QTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._maxHeight = 200
-        self.textChanged.connect(self.adjust_height)
+        self.setAcceptRichText(False)
+        self._heights = BlockHeightCache(self.document(), self.font())
+        self._adjust_pending = False
+        self.document().contentsChange.connect(self._on_contents_change)
         self.adjust_height()
 
+    def _on_contents_change(self, pos: int, removed: int, added: int) -> None:
+        self._heights.on_contents_change(pos, removed, added)
+        self._schedule_adjust()
+
+    def _schedule_adjust(self) -> None:
+        # a paste or an IME burst emits several changes – resize once per event-loop tick
+        if not self._adjust_pending:
+            self._adjust_pending = True
+            QtCore.QTimer.singleShot(0, self.adjust_height)
+
+    def _text_width(self) -> float:
+        return max(1.0, self.viewport().width() - 2 * self.document().documentMargin())
+
     def adjust_height(self):
-        doc_height = self.document().size().height()
+        self._adjust_pending = False
+        if self._heights.width() != self._text_width():
+            self._heights.reset(self._text_width(), self.font())
+        doc_height = self._heights.total_height()
         margins = self.contentsMargins().top() + self.contentsMargins().bottom()
         height = int(doc_height + self.frameWidth() * 2 + margins)
         height = min(height, self._maxHeight)
         self.setFixedHeight(max(30, height))  # 30 is the minimum height
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if event.size().width() != event.oldSize().width():
+            self._schedule_adjust()
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Return and not event.modifiers() & Qt.ShiftModifier:
             # Handle sending the message on Enter key press without Shift
@@ -49,7 +326,7 @@ class InputTextField(QtWidgets.QTextEdit):
             super().keyPressEvent(event)
 
 class ChatWidget(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, transport: ChatTransport | None = None):
         super().__init__()
         self.setWindowTitle("Chat Application")
         self.resize(800, 600)
@@ -58,10 +335,11 @@ class ChatWidget(QtWidgets.QWidget):
         layout = QtWidgets.QVBoxLayout(self)
 
         # Chat area
-        self.chat_area = ChatArea()
+        self.history = ChatHistoryStore()
+        self.chat_area = ChatArea(store=self.history)
         layout.addWidget(self.chat_area)
         self.chat_area.show()
-        
+
 
         # Input area
         self.input_area = InputTextField(self)
@@ -72,4 +350,25 @@ class ChatWidget(QtWidgets.QWidget):
         layout.addWidget(self.send_button)
 
         # Connect button click to send message
-        #self.send_button.clicked.connect(self.send_message)
\ No newline at end of file
+        self.send_button.clicked.connect(self.send_message)
+        self.perf_overlay = PerfOverlay(self, count_paints=True)
+
+        # Transport (optional – without one messages only go to the local history)
+        self.transport = transport
+        if transport is not None:
+            transport.messages_received.connect(self._on_messages_received)
+            transport.congested.connect(lambda full: self.send_button.setEnabled(not full))
+            transport.disconnected.connect(lambda reason: self.setWindowTitle(f"Chat Application – offline ({reason})"))
+
+    def send_message(self):
+        text = self.input_area.toPlainText().strip()
+        if not text:
+            return
+        if self.transport is not None and not self.transport.send(text):
+            return  # queue full or offline; keep the text in the input
+        self.chat_area.add_messages([ChatMessage(text, outgoing=True)])
+        self.input_area.clear()
+
+    def _on_messages_received(self, texts: list[str]) -> None:
+        # one batch per flush → one row insertion and one relayout
+        self.chat_area.add_messages([ChatMessage(text) for text in texts])
@@ -1,12 +1,38 @@
-from PySide6 import QtCore, QtWidgets
-from PySide6.QtCore import Qt
+import sys, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # run as a script; chat_widget and text_measure import common
+from common.startup import StartupTimer
+startup = StartupTimer("chat")
+
+from PySide6 import QtWidgets
 from chat_widget import ChatWidget
+from transport import ChatTransport, LoopbackEchoServer
 
 
 if __name__ == "__main__":
-    import sys
-    app = QtWidgets.QApplication(sys.argv)
-    main_window = ChatWidget()
+    startup.mark("imports")
+    parser = argparse.ArgumentParser(description="Chat client")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--echo", action="store_true", help="start a local loopback echo server")
+    parser.add_argument("--offline", action="store_true", help="run without a transport")
+    args, qt_args = parser.parse_known_args()
+
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+
+    transport = None
+    if not args.offline:
+        if args.echo:
+            echo = LoopbackEchoServer(args.host, 0)
+            args.port = echo.start()
+        transport = ChatTransport(args.host, args.port)
+        transport.start()
+        app.aboutToQuit.connect(transport.stop)
+
+    main_window = ChatWidget(transport)
     main_window.setWindowTitle("Chat Application")
+    startup.mark("window built")
+    startup.watch_first_frame(main_window)
     main_window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
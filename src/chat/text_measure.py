@@ -0,0 +1,123 @@
+import math, queue
+from PySide6 import QtCore, QtGui
+
+from common import perf
+
+
+def measure_text(text: str, font: QtGui.QFont, width: float) -> tuple[int, int]:
+    """Wrapped (width, height) of plain text, laid out with QTextLayout.
+
+    Safe to call from worker threads, which is what lets the chat bubbles
+    be measured before the view ever asks for them.
+    """
+    height = 0.0
+    natural = 0.0
+    for para in text.split("\n"):
+        layout = QtGui.QTextLayout(para, font)
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            line.setPosition(QtCore.QPointF(0, height))
+            height += line.height()
+            natural = max(natural, line.naturalTextWidth())
+        layout.endLayout()
+    return math.ceil(natural), math.ceil(height)
+
+
+class BlockHeightCache:
+    """Per-block heights of a QTextDocument, kept up to date from contentsChange.
+
+    Only the blocks touched by an edit are re-measured; the document height
+    is a running sum, so asking for it never forces a layout of the whole
+    document the way ``document().size()`` does.
+    """
+
+    def __init__(self, document: QtGui.QTextDocument, font: QtGui.QFont):
+        self._doc = document
+        self._font = QtGui.QFont(font)
+        self._width = -1.0
+        self._heights: list[float] = []
+        self._total = 0.0
+
+    def _measure_block(self, number: int) -> float:
+        text = self._doc.findBlockByNumber(number).text()
+        return measure_text(text, self._font, self._width)[1]
+
+    def reset(self, width: float, font: QtGui.QFont | None = None) -> None:
+        """Re-measure everything, e.g. after the text width or font changed."""
+        if font is not None:
+            self._font = QtGui.QFont(font)
+        self._width = width
+        self._heights = [self._measure_block(i) for i in range(self._doc.blockCount())]
+        self._total = sum(self._heights)
+
+    def width(self) -> float:
+        return self._width
+
+    def total_height(self) -> float:
+        return self._total + 2 * self._doc.documentMargin()
+
+    def on_contents_change(self, pos: int, removed: int, added: int) -> None:
+        if self._width < 0:
+            return  # not measured yet, the first reset() covers it
+        first = self._doc.findBlock(pos).blockNumber()
+        last_block = self._doc.findBlock(pos + added)
+        last = last_block.blockNumber() if last_block.isValid() else self._doc.blockCount() - 1
+        if first < 0:
+            first = 0
+        # blocks after the edit only shifted; map the new range back onto the old list
+        old_last = last - (self._doc.blockCount() - len(self._heights))
+
+        fresh = [self._measure_block(i) for i in range(first, last + 1)]
+        self._total += sum(fresh) - sum(self._heights[first:old_last + 1])
+        self._heights[first:old_last + 1] = fresh
+
+
+class BubbleMeasureThread(QtCore.QThread):
+    """Pre-computes chat bubble heights in the background, one queued batch after another.
+
+    A single thread serves the whole view.  Every batch is measured at the
+    width of the latest ``measure`` call, so batches queued before a resize
+    are not laid out for a width that is already gone.  Results are written
+    straight into the messages' layout cache, so by the time the view lays
+    those rows out the delegate only does a lookup.
+    """
+
+    def __init__(self, font: QtGui.QFont, extra: int):
+        super().__init__()
+        self._font = QtGui.QFont(font)
+        self._extra = extra  # padding + margin around the text
+        self._width = -1
+        self._queue: queue.SimpleQueue[list | None] = queue.SimpleQueue()
+
+    def measure(self, messages: list, text_width: int) -> None:
+        self._width = text_width
+        self._queue.put(messages)
+
+    def stop(self) -> None:
+        self.requestInterruption()
+        self._queue.put(None)  # wake the thread if it is waiting for work
+        self.wait()
+
+    def run(self) -> None:
+        while not self.isInterruptionRequested():
+            batch = self._queue.get()
+            if batch is None:
+                return
+            self._measure_batch(batch)
+
+    @perf.timed("chat layout precompute", "chat")
+    def _measure_batch(self, messages: list) -> None:
+        for msg in messages:
+            if self.isInterruptionRequested():
+                return
+            width = self._width
+            if msg._height_width == width:
+                continue
+            natural, height = measure_text(msg.text, self._font, width)
+            msg._height = height + self._extra
+            msg._natural_width = natural
+            msg._height_width = width  # written last: a matching width implies valid sizes
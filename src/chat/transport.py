@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+from PySide6 import QtCore
+
+
+def _encode(text: str) -> bytes:
+    return json.dumps({"text": text}, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _decode(line: bytes) -> str:
+    return json.loads(line)["text"]
+
+
+class ChatTransport(QtCore.QObject):
+    """JSON-lines chat client on an asyncio loop that runs in its own thread.
+
+    The GUI talks to it through ``send`` and Qt signals only; signals emitted
+    from the loop thread are queued into the Qt event loop.  Outgoing
+    messages wait in a bounded queue and are written in batches.  Once
+    ``max_pending`` messages are queued, ``send`` refuses further ones and
+    ``congested(True)`` fires until the queue drains below the low watermark.
+    After the connection fails or drops ``send`` returns False for good.
+    Incoming lines are buffered and handed to the GUI as one list per
+    ``flush_interval``, so a burst of messages costs one view update.
+    """
+
+    connected = QtCore.Signal()
+    disconnected = QtCore.Signal(str)
+    congested = QtCore.Signal(bool)
+    messages_received = QtCore.Signal(list)  # list[str]
+    _incoming_ready = QtCore.Signal()
+
+    def __init__(self, host: str, port: int, max_pending: int = 256, batch_size: int = 64,
+                 flush_interval: int = 16, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self._max_pending = max_pending
+        self._low_watermark = max_pending // 2
+        self._batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._congested = False
+        self._closed = False  # set once the loop thread is done with the connection
+        self._inbox: list[str] = []
+        self._flush_scheduled = False
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._outbox: asyncio.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval)
+        self._flush_timer.timeout.connect(self._flush_incoming)
+        self._incoming_ready.connect(self._flush_timer.start)
+
+    # ------------------------------------------------------------------ GUI side
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run_loop, name="ChatTransport", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._main_task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._flush_incoming()
+
+    def send(self, text: str) -> bool:
+        """Queue a message; returns False while the send queue is full or the connection is gone."""
+        if self._loop is None:
+            raise RuntimeError("ChatTransport.send() called before start()")
+        with self._lock:
+            if self._closed:
+                return False
+            if self._pending >= self._max_pending:
+                newly = not self._congested
+                self._congested = True
+            else:
+                self._pending += 1
+                newly = None
+        if newly is not None:
+            if newly:
+                self.congested.emit(True)
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._outbox.put_nowait, text)
+        except RuntimeError:  # the loop closed between the check above and now
+            with self._lock:
+                self._pending -= 1
+            return False
+        return True
+
+    def is_closed(self) -> bool:
+        with self._lock:
+            return self._closed
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def _flush_incoming(self) -> None:
+        with self._lock:
+            batch, self._inbox = self._inbox, []
+            self._flush_scheduled = False
+        if batch:
+            self.messages_received.emit(batch)
+
+    # ------------------------------------------------------------------ loop thread
+    def _run_loop(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        # unbounded on purpose: the bound is enforced in send(), where the caller can react
+        self._outbox = asyncio.Queue()
+        self._main_task = self._loop.create_task(self._main())
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._main_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def _mark_closed(self, reason: str) -> None:
+        """No more sends: drop what is still queued and lift any congestion."""
+        with self._lock:
+            self._closed = True
+            self._pending = 0
+            was_congested, self._congested = self._congested, False
+        if was_congested:
+            self.congested.emit(False)
+        self.disconnected.emit(reason)
+
+    async def _main(self) -> None:
+        reason = "closed"
+        try:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as err:
+                reason = str(err)
+                return
+            self.connected.emit()
+
+            tasks = [asyncio.create_task(self._read_loop(reader)), asyncio.create_task(self._write_loop(writer))]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        reason = str(task.exception())
+            finally:
+                for task in tasks:
+                    task.cancel()
+                writer.close()
+        finally:
+            self._mark_closed(reason)  # also when stop() cancels a connect that is still pending
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            text = _decode(line)
+            with self._lock:
+                self._inbox.append(text)
+                notify = not self._flush_scheduled
+                self._flush_scheduled = True
+            if notify:
+                self._incoming_ready.emit()
+
+    async def _write_loop(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            batch = [await self._outbox.get()]
+            while len(batch) < self._batch_size and not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            writer.write(b"".join(_encode(text) for text in batch))
+            await writer.drain()  # TCP backpressure ends up here
+
+            with self._lock:
+                self._pending -= len(batch)
+                relieved = self._congested and self._pending <= self._low_watermark
+                if relieved:
+                    self._congested = False
+            if relieved:
+                self.congested.emit(False)
+
+
+class LoopbackEchoServer:
+    """Tiny JSON-lines echo server on 127.0.0.1 for trying the transport locally."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                writer.write(line)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def start(self) -> int:
+        """Start serving in a daemon thread and return the bound port."""
+        self._thread = threading.Thread(target=self._run, name="EchoServer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+if __name__ == "__main__":
+    import sys
+    server = LoopbackEchoServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 5555)
+    print(f"echo server on {server.host}:{server.start()}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,41 @@
+from typing import Callable
+from PySide6 import QtCore, QtWidgets
+
+
+class LazyTabWidget(QtWidgets.QTabWidget):
+    """QTabWidget whose pages are built the first time they are activated.
+
+    Each lazy tab starts as an empty placeholder; the factory runs when the
+    tab becomes current (or on ``ensure_built``) and its widget is put into
+    the placeholder, so tab indices never change.
+    """
+
+    page_built = QtCore.Signal(int, QtWidgets.QWidget)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._factories: dict[QtWidgets.QWidget, Callable[[], QtWidgets.QWidget]] = {}
+        self.currentChanged.connect(self.ensure_built)
+
+    def add_lazy_tab(self, factory: Callable[[], QtWidgets.QWidget], title: str) -> int:
+        placeholder = QtWidgets.QWidget()
+        layout = QtWidgets.QVBoxLayout(placeholder)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self._factories[placeholder] = factory
+        index = self.addTab(placeholder, title)
+        if index == self.currentIndex():
+            self.ensure_built(index)  # first tab is visible right away
+        return index
+
+    def is_built(self, index: int) -> bool:
+        return self.widget(index) not in self._factories
+
+    def ensure_built(self, index: int) -> QtWidgets.QWidget | None:
+        placeholder = self.widget(index)
+        factory = self._factories.pop(placeholder, None)
+        if factory is None:
+            return None
+        page = factory()
+        placeholder.layout().addWidget(page)
+        self.page_built.emit(index, page)
+        return page
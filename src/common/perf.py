@@ -0,0 +1,179 @@
+"""Scoped timers, counters and frame statistics shared by all apps.
+
+Everything is off unless ``AQUABUDDY_PROFILE`` is set (or ``enable()`` is
+called).  While off, ``scope()`` hands back one shared no-op context
+manager and ``count``/``frame``/``instant`` return after a single flag
+check, and so does a ``timed`` function before calling straight through.
+
+Recorded events can be written as a Chrome trace-event JSON file
+(chrome://tracing, Perfetto) with ``export_chrome_trace``; setting
+``AQUABUDDY_TRACE=<path>`` does that automatically at exit.
+"""
+import atexit, collections, functools, json, os, sys, threading, time
+
+ENABLED = bool(os.environ.get("AQUABUDDY_PROFILE"))
+
+_T0 = time.perf_counter()
+_PID = os.getpid()
+_events: collections.deque = collections.deque(maxlen=200_000)
+_counters: collections.Counter = collections.Counter()
+_frame_times: collections.deque = collections.deque(maxlen=600)
+_last_frame: float | None = None
+_frame_count = 0
+COUNTER_SNAPSHOT_FRAMES = 30  # counters go into the trace every this many frames
+
+
+def enable(flag: bool = True) -> None:
+    """Switch recording on or off at runtime; affects ``scope`` and ``timed`` alike."""
+    global ENABLED
+    ENABLED = flag
+
+
+def _us(t: float) -> float:
+    return (t - _T0) * 1e6
+
+
+# ---------------------------------------------------------------------- scopes
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("name", "cat", "start")
+
+    def __init__(self, name: str, cat: str):
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _events.append(("X", self.name, self.cat, self.start, end - self.start, threading.get_ident()))
+        return False
+
+
+def scope(name: str, cat: str = "app"):
+    """``with perf.scope("search"):`` – records a complete trace event."""
+    return _Scope(name, cat) if ENABLED else _NULL_SCOPE
+
+
+def timed(name: str | None = None, cat: str = "app"):
+    """Decorator form of ``scope``; checks the flag per call, so ``enable()`` applies later on too."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Scope(label, cat):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def count(name: str, n: int = 1) -> None:
+    if ENABLED:
+        _counters[name] += n
+
+
+def instant(name: str, cat: str = "app") -> None:
+    """A point-in-time marker, e.g. a startup milestone."""
+    if ENABLED:
+        _events.append(("i", name, cat, time.perf_counter(), 0.0, threading.get_ident()))
+
+
+def frame() -> None:
+    """Call once per presented frame; feeds FPS and frame-time percentiles."""
+    global _last_frame, _frame_count
+    if not ENABLED:
+        return
+    now = time.perf_counter()
+    if _last_frame is not None:
+        _frame_times.append(now - _last_frame)
+    _last_frame = now
+    _frame_count += 1  # not len(_frame_times): that stops growing once the window is full
+    if _frame_count % COUNTER_SNAPSHOT_FRAMES == 0 and _counters:
+        _events.append(("C", "counters", "app", now, dict(_counters), threading.get_ident()))
+
+
+# ---------------------------------------------------------------------- readout
+def counters() -> dict[str, int]:
+    return dict(_counters)
+
+
+def frame_stats() -> dict[str, float]:
+    """FPS and p50/p95/p99 frame time (ms) over the last few hundred frames."""
+    times = sorted(_frame_times)
+    if not times:
+        return {"fps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+    def pct(p: float) -> float:
+        return times[min(len(times) - 1, int(p * len(times)))] * 1000
+
+    return {"fps": len(times) / sum(times), "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)}
+
+
+def memory_rss() -> int:
+    """Resident set size of this process in bytes (0 if unknown)."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as fp:
+                return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return 0
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (f, ctypes.c_size_t) for f in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        info = _Counters()
+        info.cb = ctypes.sizeof(info)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(info), info.cb):
+            return info.WorkingSetSize
+        return 0
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def export_chrome_trace(path: str) -> int:
+    """Write recorded events as Chrome trace-event JSON; returns the event count."""
+    out = []
+    for ph, name, cat, start, extra, tid in list(_events):
+        event = {"name": name, "cat": cat, "ph": ph, "ts": _us(start), "pid": _PID, "tid": tid}
+        if ph == "X":
+            event["dur"] = extra * 1e6
+        elif ph == "C":
+            event["args"] = extra
+        elif ph == "i":
+            event["s"] = "p"
+        out.append(event)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, fp)
+    return len(out)
+
+
+if os.environ.get("AQUABUDDY_TRACE"):
+    atexit.register(lambda: export_chrome_trace(os.environ["AQUABUDDY_TRACE"]))
@@ -0,0 +1,75 @@
+import time
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from common import perf
+
+
+class PerfOverlay(QtWidgets.QLabel):
+    """Small translucent readout of FPS, frame-time percentiles, memory and counters.
+
+    Sits in the top-left corner of its parent and refreshes a few times a
+    second.  F12 toggles it, Ctrl+Shift+E writes a Chrome trace into the
+    working directory.  With ``count_paints`` every paint of the parent
+    counts as a frame, for widgets that have no render loop of their own.
+    Recording that F12 switched on is switched off again with the overlay.
+    """
+
+    def __init__(self, parent: QtWidgets.QWidget, count_paints: bool = False, interval: int = 250):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(0, 0, 0, 160); color: #7CFC00; padding: 4px;"
+                           "font-family: monospace; font-size: 10px;")
+        self.move(4, 4)
+        self._count_paints = count_paints
+        self._owns_recording = False  # True if this overlay turned perf recording on
+        if count_paints:
+            parent.installEventFilter(self)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.refresh)
+
+        toggle = QtGui.QShortcut(QtGui.QKeySequence("F12"), parent)
+        toggle.activated.connect(lambda: self.set_active(not self.isVisible()))
+        export = QtGui.QShortcut(QtGui.QKeySequence("Ctrl+Shift+E"), parent)
+        export.activated.connect(self.export_trace)
+
+        self.set_active(perf.ENABLED)
+
+    def set_active(self, active: bool) -> None:
+        if active and not perf.ENABLED:
+            perf.enable(True)
+            self._owns_recording = True
+        elif not active and self._owns_recording:
+            perf.enable(False)
+            self._owns_recording = False
+        self.setVisible(active)
+        if active:
+            self.raise_()
+            self._timer.start()
+            self.refresh()
+        else:
+            self._timer.stop()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Paint:
+            perf.frame()
+        return False
+
+    def refresh(self) -> None:
+        stats = perf.frame_stats()
+        lines = [
+            f"{stats['fps']:5.1f} fps",
+            f"frame p50 {stats['p50']:5.1f}  p95 {stats['p95']:5.1f}  p99 {stats['p99']:5.1f} ms",
+            f"rss {perf.memory_rss() / (1024 * 1024):.1f} MB",
+        ]
+        for name, value in sorted(perf.counters().items()):
+            lines.append(f"{name}: {value}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+
+    def export_trace(self) -> None:
+        path = time.strftime("trace-%Y%m%d-%H%M%S.json")
+        n = perf.export_chrome_trace(path)
+        self.setToolTip(f"{n} events → {path}")
+        QtWidgets.QToolTip.showText(self.mapToGlobal(self.rect().bottomLeft()), self.toolTip(), self)
@@ -0,0 +1,56 @@
+import os, sys, time
+from PySide6 import QtCore
+
+from common import perf
+
+_PROCESS_T0 = time.perf_counter()  # as close to interpreter start as an import gets
+
+
+class StartupTimer(QtCore.QObject):
+    """Collects named marks from process start to the first painted frame.
+
+    Import this module first thing in an entry script.  ``watch_first_frame``
+    records the first paint of a window; the report goes to stderr when the
+    ``AQUABUDDY_STARTUP`` environment variable is set and is always
+    available from ``report()``.
+    """
+
+    first_frame = QtCore.Signal(float)  # seconds since process start
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.marks: list[tuple[str, float]] = []
+        self._watched = None
+
+    def mark(self, label: str) -> float:
+        elapsed = time.perf_counter() - _PROCESS_T0
+        self.marks.append((label, elapsed))
+        perf.instant(f"startup: {label}", "startup")
+        return elapsed
+
+    def watch_first_frame(self, widget) -> None:
+        self._watched = widget
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self._watched and event.type() == QtCore.QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            self._watched = None
+            # the paint event is being handled now; the frame is on screen once it returns
+            QtCore.QTimer.singleShot(0, self._on_first_frame)
+        return False
+
+    def _on_first_frame(self) -> None:
+        elapsed = self.mark("first frame")
+        if os.environ.get("AQUABUDDY_STARTUP"):
+            print(self.report(), file=sys.stderr)
+        self.first_frame.emit(elapsed)
+
+    def report(self) -> str:
+        lines = [f"startup [{self.name}]"]
+        prev = 0.0
+        for label, t in self.marks:
+            lines.append(f"  {label:<16} {t * 1000:8.1f} ms  (+{(t - prev) * 1000:.1f})")
+            prev = t
+        return "\n".join(lines)
@@ -1,9 +1,14 @@
-import os
+import sys
 import time
 
-pfad = r"C:\Users\mschulz\Pictures\boom.png"
+from bulk_meta import TimestampRule, apply_metadata, walk
+
+# Datei oder ganzer Ordner; für mehr Optionen: python bulk_meta.py --help
+pfad = sys.argv[1] if len(sys.argv) > 1 else r"C:\Users\mschulz\Pictures\boom.png"
 neue_mtime = time.mktime((1990, 1, 1, 12, 34, 0, 0, 0, -1))
 # (atime = Zugriffszeit), hier gleichsetzen mit mtime
-os.utime(pfad, (neue_mtime, neue_mtime))
+report = apply_metadata(walk([pfad]), TimestampRule.fixed(neue_mtime))
 
-print("Änderungsdatum gesetzt auf:", time.ctime(neue_mtime))
+print("Änderungsdatum gesetzt auf:", time.ctime(neue_mtime), f"({report.changed} Dateien)")
+for err in report.errors:
+    print("Fehler:", err["path"], err["error"])
@@ -0,0 +1,194 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from llv_utility import pc_to_lorom
+
+BLOCK = 256  # bytes decoded (and cached) at a time
+
+# ---------------------------------------------------------------------- opcode table
+# 16 opcodes per row, "MNEMONIC mode"; rows are $00, $10, … $F0
+_TABLE = """
+BRK imm8  ORA dpix COP imm8  ORA sr   TSB dp   ORA dp   ASL dp   ORA dpil  PHP imp ORA immm ASL acc PHD imp TSB abs  ORA abs  ASL abs  ORA long
+BPL rel8  ORA dpiy ORA dpi   ORA sriy TRB dp   ORA dpx  ASL dpx  ORA dpily CLC imp ORA absy INC acc TCS imp TRB abs  ORA absx ASL absx ORA longx
+JSR abs   AND dpix JSL long  AND sr   BIT dp   AND dp   ROL dp   AND dpil  PLP imp AND immm ROL acc PLD imp BIT abs  AND abs  ROL abs  AND long
+BMI rel8  AND dpiy AND dpi   AND sriy BIT dpx  AND dpx  ROL dpx  AND dpily SEC imp AND absy DEC acc TSC imp BIT absx AND absx ROL absx AND longx
+RTI imp   EOR dpix WDM imm8  EOR sr   MVP blk  EOR dp   LSR dp   EOR dpil  PHA imp EOR immm LSR acc PHK imp JMP abs  EOR abs  LSR abs  EOR long
+BVC rel8  EOR dpiy EOR dpi   EOR sriy MVN blk  EOR dpx  LSR dpx  EOR dpily CLI imp EOR absy PHY imp TCD imp JML long EOR absx LSR absx EOR longx
+RTS imp   ADC dpix PER rel16 ADC sr   STZ dp   ADC dp   ROR dp   ADC dpil  PLA imp ADC immm ROR acc RTL imp JMP absi ADC abs  ROR abs  ADC long
+BVS rel8  ADC dpiy ADC dpi   ADC sriy STZ dpx  ADC dpx  ROR dpx  ADC dpily SEI imp ADC absy PLY imp TDC imp JMP absix ADC absx ROR absx ADC longx
+BRA rel8  STA dpix BRL rel16 STA sr   STY dp   STA dp   STX dp   STA dpil  DEY imp BIT immm TXA imp PHB imp STY abs  STA abs  STX abs  STA long
+BCC rel8  STA dpiy STA dpi   STA sriy STY dpx  STA dpx  STX dpy  STA dpily TYA imp STA absy TXS imp TXY imp STZ abs  STA absx STZ absx STA longx
+LDY immx  LDA dpix LDX immx  LDA sr   LDY dp   LDA dp   LDX dp   LDA dpil  TAY imp LDA immm TAX imp PLB imp LDY abs  LDA abs  LDX abs  LDA long
+BCS rel8  LDA dpiy LDA dpi   LDA sriy LDY dpx  LDA dpx  LDX dpy  LDA dpily CLV imp LDA absy TSX imp TYX imp LDY absx LDA absx LDX absy LDA longx
+CPY immx  CMP dpix REP imm8  CMP sr   CPY dp   CMP dp   DEC dp   CMP dpil  INY imp CMP immm DEX imp WAI imp CPY abs  CMP abs  DEC abs  CMP long
+BNE rel8  CMP dpiy CMP dpi   CMP sriy PEI dpi  CMP dpx  DEC dpx  CMP dpily CLD imp CMP absy PHX imp STP imp JML absil CMP absx DEC absx CMP longx
+CPX immx  SBC dpix SEP imm8  SBC sr   CPX dp   SBC dp   INC dp   SBC dpil  INX imp SBC immm NOP imp XBA imp CPX abs  SBC abs  INC abs  SBC long
+BEQ rel8  SBC dpiy SBC dpi   SBC sriy PEA abs  SBC dpx  INC dpx  SBC dpily SED imp SBC absy PLX imp XCE imp JSR absix SBC absx INC absx SBC longx
+"""
+_tokens = _TABLE.split()
+MNEMONIC = _tokens[0::2]
+MODE = _tokens[1::2]
+assert len(MNEMONIC) == 256
+
+# operand bytes per mode; immm/immx depend on the M/X flags
+_OPERAND_SIZE = {
+    "imp": 0, "acc": 0, "imm8": 1, "rel8": 1, "rel16": 2, "blk": 2,
+    "dp": 1, "dpx": 1, "dpy": 1, "dpi": 1, "dpix": 1, "dpiy": 1, "dpil": 1, "dpily": 1, "sr": 1, "sriy": 1,
+    "abs": 2, "absx": 2, "absy": 2, "absi": 2, "absix": 2, "absil": 2,
+    "long": 3, "longx": 3,
+}
+_FORMAT = {
+    "imp": "", "acc": "A", "imm8": "#${:02X}", "rel8": "${:04X}", "rel16": "${:04X}", "blk": "${:02X},${:02X}",
+    "dp": "${:02X}", "dpx": "${:02X},x", "dpy": "${:02X},y", "dpi": "(${:02X})", "dpix": "(${:02X},x)",
+    "dpiy": "(${:02X}),y", "dpil": "[${:02X}]", "dpily": "[${:02X}],y", "sr": "${:02X},s", "sriy": "(${:02X},s),y",
+    "abs": "${:04X}", "absx": "${:04X},x", "absy": "${:04X},y", "absi": "(${:04X})", "absix": "(${:04X},x)",
+    "absil": "[${:04X}]", "long": "${:06X}", "longx": "${:06X},x",
+}
+
+
+@dataclass(slots=True)
+class Instruction:
+    offset: int  # file offset
+    raw: bytes
+    mnemonic: str
+    operand: str
+
+
+@dataclass(slots=True)
+class Block:
+    """Instructions decoded from ``start`` up to the next block boundary."""
+
+    start: int
+    instructions: list[Instruction]
+    end: int  # first offset after the last instruction (may reach into the next block)
+    m8: bool  # flag state after the last instruction
+    x8: bool
+
+
+def decode_block(data, start: int, m8: bool, x8: bool, header: int = 0) -> Block:
+    """Linear sweep from ``start`` to the end of its 256-byte block.
+
+    REP/SEP update the accumulator (M) and index (X) width on the way, so
+    immediate operands get the right size; everything else keeps the state.
+    """
+    limit = (start // BLOCK + 1) * BLOCK
+    size = len(data)
+    out = []
+    pos = start
+    while pos < limit and pos < size:
+        op = data[pos]
+        mode = MODE[op]
+        if mode == "immm":
+            n, fmt = (1, "#${:02X}") if m8 else (2, "#${:04X}")
+        elif mode == "immx":
+            n, fmt = (1, "#${:02X}") if x8 else (2, "#${:04X}")
+        else:
+            n, fmt = _OPERAND_SIZE[mode], _FORMAT[mode]
+        if pos + 1 + n > size:
+            out.append(Instruction(pos, bytes(data[pos:size]), "db", ""))
+            pos = size
+            break
+
+        raw = bytes(data[pos:pos + 1 + n])
+        if mode == "blk":
+            operand = fmt.format(raw[2], raw[1])  # encoded dst, src; written src, dst
+        elif mode in ("rel8", "rel16"):
+            disp = int.from_bytes(raw[1:], "little", signed=True)
+            operand = fmt.format((pc_to_lorom(pos, header) + 1 + n + disp) & 0xFFFF)
+        elif n:
+            operand = fmt.format(int.from_bytes(raw[1:], "little"))
+        else:
+            operand = fmt
+
+        if op == 0xC2:  # REP
+            m8 = m8 and not raw[1] & 0x20
+            x8 = x8 and not raw[1] & 0x10
+        elif op == 0xE2:  # SEP
+            m8 = m8 or bool(raw[1] & 0x20)
+            x8 = x8 or bool(raw[1] & 0x10)
+        out.append(Instruction(pos, raw, MNEMONIC[op], operand))
+        pos += 1 + n
+    return Block(start, out, pos, m8, x8)
+
+
+class Disassembler:
+    """Lazily decoded, cached 65816 disassembly of a byte buffer.
+
+    Blocks are decoded on demand and kept in an LRU keyed by
+    (start offset, M, X).  Decoding a block records where the next block's
+    first instruction starts and with which flags, so scrolling forward
+    follows the real instruction stream; jumping somewhere new starts at
+    the block boundary with the default flags.
+    """
+
+    def __init__(self, data=b"", header: int = 0, m8: bool = False, x8: bool = False, cache_blocks: int = 512):
+        self._cache: OrderedDict[tuple[int, bool, bool], Block] = OrderedDict()
+        self._capacity = cache_blocks
+        self.set_data(data, header, m8, x8)
+
+    def set_data(self, data, header: int = 0, m8: bool | None = None, x8: bool | None = None) -> None:
+        self.data = data
+        self.header = header
+        if m8 is not None:
+            self.m8 = m8
+        if x8 is not None:
+            self.x8 = x8
+        self.invalidate()
+
+    def set_flags(self, m8: bool, x8: bool) -> None:
+        """Default register widths used wherever decoding has to start cold."""
+        self.m8, self.x8 = m8, x8
+        self._entries.clear()  # cached blocks stay valid, they are keyed by flags
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+        self._entries: dict[int, tuple[int, bool, bool]] = {}
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    # ------------------------------------------------------------------ blocks
+    def block(self, start: int, m8: bool, x8: bool) -> Block:
+        key = (start, m8, x8)
+        blk = self._cache.get(key)
+        if blk is not None:
+            self._cache.move_to_end(key)
+            return blk
+        blk = decode_block(self.data, start, m8, x8, self.header)
+        self._cache[key] = blk
+        if len(self._cache) > self._capacity:
+            self._cache.popitem(last=False)
+        self._entries[blk.end // BLOCK] = (blk.end, blk.m8, blk.x8)
+        return blk
+
+    def block_at(self, index: int) -> Block:
+        """The block with number ``index``, entered the way we last saw it."""
+        start, m8, x8 = self._entries.get(index, (index * BLOCK, self.m8, self.x8))
+        return self.block(start, m8, x8)
+
+    # ------------------------------------------------------------------ navigation
+    def instructions_from(self, offset: int, count: int) -> list[Instruction]:
+        """Up to ``count`` instructions, starting with the first one at or after ``offset``."""
+        out: list[Instruction] = []
+        if offset >= len(self.data):
+            return out
+        blk = self.block_at(offset // BLOCK)
+        while len(out) < count:
+            out.extend(ins for ins in blk.instructions if ins.offset >= offset)
+            if blk.end >= len(self.data) or not blk.instructions:
+                break
+            offset = blk.end
+            blk = self.block(blk.end, blk.m8, blk.x8)
+        return out[:count]
+
+    def step_back(self, offset: int, count: int) -> int:
+        """Offset of the instruction ``count`` instructions before ``offset``."""
+        index = offset // BLOCK
+        starts: list[int] = []
+        while index >= 0:
+            before = [ins.offset for ins in self.block_at(index).instructions if ins.offset < offset]
+            starts[:0] = before
+            if len(starts) >= count:
+                return starts[-count]
+            index -= 1
+        return 0
@@ -0,0 +1,100 @@
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtGui import QFontDatabase
+
+from common import perf
+from disasm65816 import Disassembler
+from llv_utility import pc_to_lorom
+
+
+class DisassemblyView(QtWidgets.QAbstractScrollArea):
+    """65816 listing that only decodes what is on screen.
+
+    The scroll bar runs over byte offsets; every paint asks the
+    Disassembler for the rows starting at the current offset, which are
+    served from its block cache after the first visit.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.dis = Disassembler()
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        font.setPointSize(11)
+        self.setFont(font)
+        self.viewport().setAttribute(QtCore.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    # ------------------------------------------------------------------ data
+    def set_data(self, data, header: int = 0) -> None:
+        self.dis.set_data(data, header)
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(len(data) - 1, 0))
+        bar.setSingleStep(2)
+        bar.setPageStep(self._rows() * 2)
+        self.viewport().update()
+
+    def set_flags(self, m8: bool, x8: bool) -> None:
+        self.dis.set_flags(m8, x8)
+        self.viewport().update()
+
+    def goto(self, offset: int) -> None:
+        self.verticalScrollBar().setValue(offset)
+
+    def offset(self) -> int:
+        return self.verticalScrollBar().value()
+
+    # ------------------------------------------------------------------ scrolling
+    def _rows(self) -> int:
+        return max(1, self.viewport().height() // self.fontMetrics().height())
+
+    def _scroll_rows(self, rows: int) -> None:
+        if rows > 0:
+            ins = self.dis.instructions_from(self.offset(), rows + 1)
+            if len(ins) > rows:
+                self.goto(ins[rows].offset)
+        elif rows < 0:
+            self.goto(self.dis.step_back(self.offset(), -rows))
+
+    def wheelEvent(self, event):
+        self._scroll_rows(-3 * event.angleDelta().y() // 120)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        steps = {
+            QtCore.Qt.Key.Key_Down: 1, QtCore.Qt.Key.Key_Up: -1,
+            QtCore.Qt.Key.Key_PageDown: self._rows() - 1, QtCore.Qt.Key.Key_PageUp: 1 - self._rows(),
+        }
+        if key in steps:
+            self._scroll_rows(steps[key])
+        elif key == QtCore.Qt.Key.Key_Home:
+            self.goto(0)
+        else:
+            super().keyPressEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.verticalScrollBar().setPageStep(self._rows() * 2)
+
+    # ------------------------------------------------------------------ painting
+    @perf.timed("disasm paint", "filedump")
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().base())
+        if not len(self.dis):
+            return
+        fm = self.fontMetrics()
+        lh = fm.height()
+        text_color = self.palette().text().color()
+        addr_color = self.palette().placeholderText().color()
+        x_bytes = fm.horizontalAdvance("$00:0000  ")
+        x_code = x_bytes + fm.horizontalAdvance("00 00 00 00  ")
+
+        y = fm.ascent()
+        for ins in self.dis.instructions_from(self.offset(), self._rows() + 1):
+            lorom = pc_to_lorom(ins.offset, self.dis.header)
+            painter.setPen(addr_color)
+            painter.drawText(0, y, f"${lorom >> 16:02X}:{lorom & 0xFFFF:04X}")
+            painter.drawText(x_bytes, y, " ".join(f"{b:02X}" for b in ins.raw))
+            painter.setPen(text_color)
+            painter.drawText(x_code, y, f"{ins.mnemonic} {ins.operand}")
+            y += lh
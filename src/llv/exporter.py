@@ -0,0 +1,170 @@
+import base64
+from collections.abc import Callable, Iterator
+
+import numpy as np
+
+from llv_utility import dump_line
+
+FORMATS = {
+    "dump": "Hex dump (as shown)",
+    "hex": "Hex bytes",
+    "c": "C array",
+    "ascii": "ASCII",
+    "base64": "Base64",
+}
+CHUNK = 1 << 20  # source bytes formatted per step
+CLIPBOARD_LIMIT = 32 << 20  # characters we are willing to put on the clipboard
+BYTES_PER_LINE = 16
+
+_PRINTABLE = bytes(b if 32 <= b <= 126 else ord(".") for b in range(256))
+_DIGITS = np.frombuffer(b"0123456789ABCDEF", np.uint8)
+_C_PREFIX = int.from_bytes(b"0x", "little")
+_C_SEP = int.from_bytes(b", ", "little")
+
+
+# ---------------------------------------------------------------------- formatters
+# bytes.hex() does the per-byte work in C; numpy only places whole rows and columns.
+def _lines(body: np.ndarray, width: int, indent: int = 0) -> np.ndarray:
+    """Rows of ``body`` (one per line), each prefixed by spaces and ended by a newline."""
+    out = np.full((body.shape[0], indent + width + 1), ord(" "), np.uint8)
+    out[:, indent:indent + width] = body
+    out[:, -1] = ord("\n")
+    return out
+
+
+def format_hex(buf) -> bytes:
+    if not len(buf):
+        return b""
+    out = bytearray(memoryview(buf).hex(" ").upper().encode())
+    out.append(ord("\n"))
+    np.frombuffer(out, np.uint8)[3 * BYTES_PER_LINE - 1::3 * BYTES_PER_LINE] = ord("\n")
+    return bytes(out)
+
+
+def format_c(buf) -> bytes:
+    n = len(buf)
+    if not n:
+        return b""
+    cells = np.empty(3 * n, np.uint16)  # "0x" "XX" ", " per byte
+    cells[0::3] = _C_PREFIX
+    cells[1::3] = np.frombuffer(memoryview(buf).hex().upper().encode(), np.uint16)
+    cells[2::3] = _C_SEP
+    text = cells.view(np.uint8)
+    full = n // BYTES_PER_LINE * BYTES_PER_LINE
+    parts = []
+    if full:
+        body = text[:6 * full].reshape(-1, 6 * BYTES_PER_LINE)[:, :-1]  # drop the trailing space
+        parts.append(_lines(body, body.shape[1], indent=4).tobytes())
+    if full < n:
+        parts.append(b"    " + text[6 * full:-1].tobytes() + b"\n")
+    return b"".join(parts)
+
+
+def format_ascii(buf) -> bytes:
+    text = bytes(buf).translate(_PRINTABLE)
+    full = len(text) // BYTES_PER_LINE * BYTES_PER_LINE
+    out = b""
+    if full:
+        body = np.frombuffer(text, np.uint8, count=full).reshape(-1, BYTES_PER_LINE)
+        out = _lines(body, BYTES_PER_LINE).tobytes()
+    if full < len(text):
+        out += text[full:] + b"\n"
+    return out
+
+
+def format_base64(buf) -> bytes:
+    """MIME-style base64, 76 characters per line."""
+    enc = base64.b64encode(buf)
+    full = len(enc) // 76 * 76
+    out = b""
+    if full:
+        out = _lines(np.frombuffer(enc, np.uint8, count=full).reshape(-1, 76), 76).tobytes()
+    if full < len(enc):
+        out += enc[full:] + b"\n"
+    return out
+
+
+def format_dump(buf, addr: int = 0) -> bytes:
+    """FileDump's own layout ('AAAAAAAA: XX … XX  XX … XX  ascii'), same as ``dump_line``."""
+    view = memoryview(buf)
+    rows = len(view) // BYTES_PER_LINE
+    parts = []
+    if rows:
+        full = view[:rows * BYTES_PER_LINE]
+        hexrows = np.frombuffer(full.hex(" ").upper().encode() + b" ", np.uint8).reshape(rows, 48)
+        out = np.full((rows, 77), ord(" "), np.uint8)
+        addrs = addr + BYTES_PER_LINE * np.arange(rows, dtype=np.uint64)
+        for k in range(8):
+            out[:, k] = _DIGITS[(addrs >> np.uint64(28 - 4 * k)) & np.uint64(0xF)]
+        out[:, 8] = ord(":")
+        out[:, 10:34] = hexrows[:, :24]
+        out[:, 35:59] = hexrows[:, 24:]
+        out[:, 60:76] = np.frombuffer(full.tobytes().translate(_PRINTABLE), np.uint8).reshape(rows, BYTES_PER_LINE)
+        out[:, 76] = ord("\n")
+        parts.append(out.tobytes())
+    if rows * BYTES_PER_LINE < len(view):
+        tail = view[rows * BYTES_PER_LINE:].tobytes()
+        parts.append(dump_line(addr + rows * BYTES_PER_LINE, tail, BYTES_PER_LINE)[0].encode())
+    return b"".join(parts)
+
+
+# ---------------------------------------------------------------------- streaming
+def estimated_size(fmt: str, n: int) -> int:
+    """Output size in characters for ``n`` source bytes (exact up to the last line)."""
+    per_byte = {"dump": 77 / 16, "hex": 3, "c": 6.25, "ascii": 17 / 16, "base64": 4 / 3 * 77 / 76}[fmt]
+    return int(n * per_byte) + 64
+
+
+def iter_export(data, start: int, end: int, fmt: str, chunk: int = CHUNK) -> Iterator[bytes]:
+    """Encoded output for ``data[start:end]``, one piece per ~``chunk`` source bytes.
+
+    Slices are memoryviews, so nothing but the piece being formatted is
+    ever held in memory.
+    """
+    unit = 57 if fmt == "base64" else BYTES_PER_LINE  # keep line breaks aligned across chunks
+    step = max(unit, chunk // unit * unit)
+    view = memoryview(data)[start:end]
+    if fmt == "c":
+        yield f"const unsigned char data[{end - start}] = {{\n".encode()
+    for i in range(0, len(view), step):
+        part = view[i:i + step]
+        if fmt == "dump":
+            yield format_dump(part, start + i)
+        elif fmt == "hex":
+            yield format_hex(part)
+        elif fmt == "c":
+            yield format_c(part)
+        elif fmt == "ascii":
+            yield format_ascii(part)
+        elif fmt == "base64":
+            yield format_base64(part)
+        else:
+            raise ValueError(f"unknown export format {fmt!r}")
+    if fmt == "c":
+        yield b"};\n"
+
+
+def export_to_file(data, start: int, end: int, fmt: str, path: str,
+                   progress: Callable[[int], None] | None = None,
+                   cancelled: Callable[[], bool] | None = None) -> int:
+    """Stream ``data[start:end]`` into ``path``; returns the bytes written."""
+    written = 0
+    done = 0
+    total = max(end - start, 1)
+    with open(path, "wb") as fp:
+        for piece in iter_export(data, start, end, fmt):
+            if cancelled is not None and cancelled():
+                break
+            fp.write(piece)
+            written += len(piece)
+            done = min(done + CHUNK, total)
+            if progress is not None:
+                progress(int(done * 100 / total))
+    return written
+
+
+def export_text(data, start: int, end: int, fmt: str, limit: int = CLIPBOARD_LIMIT) -> str:
+    """Whole export as one string, for the clipboard; ValueError if it would exceed ``limit``."""
+    if estimated_size(fmt, end - start) > limit:
+        raise ValueError(f"{end - start:,} bytes are too large for the clipboard as {FORMATS[fmt]}")
+    return b"".join(iter_export(data, start, end, fmt)).decode("ascii")
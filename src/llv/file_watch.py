@@ -0,0 +1,92 @@
+import hashlib, os
+from PySide6 import QtCore
+
+from common import perf
+
+BLOCK_SIZE = 64 * 1024  # granularity of change detection
+
+
+def block_hashes(data) -> list[bytes]:
+    """blake2b digest of every BLOCK_SIZE block of ``data``."""
+    view = memoryview(data)
+    return [hashlib.blake2b(view[i:i + BLOCK_SIZE], digest_size=16).digest()
+            for i in range(0, len(view), BLOCK_SIZE)]
+
+
+def rehash_ranges(hashes: list[bytes], data, ranges: list[tuple[int, int]]) -> None:
+    """Refresh the entries of ``hashes`` covering the given (start, end) byte ranges."""
+    view = memoryview(data)
+    for block in {b for s, e in ranges for b in range(s // BLOCK_SIZE, (e - 1) // BLOCK_SIZE + 1)}:
+        start = block * BLOCK_SIZE
+        hashes[block] = hashlib.blake2b(view[start:start + BLOCK_SIZE], digest_size=16).digest()
+
+
+class FileWatcher(QtCore.QObject):
+    """QFileSystemWatcher for one file, debounced and robust against replace-by-rename.
+
+    Tools that write a new file and rename it over the old one make the
+    watcher drop the path; it is re-added whenever the file exists again.
+    """
+
+    changed = QtCore.Signal(str)
+
+    def __init__(self, parent=None, debounce_ms: int = 300):
+        super().__init__(parent)
+        self._path: str | None = None
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_change)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._fire)
+
+    def watch(self, path: str | None) -> None:
+        if self._watcher.files():
+            self._watcher.removePaths(self._watcher.files())
+        self._path = path
+        if path:
+            self._watcher.addPath(path)
+
+    def _rewatch(self) -> None:
+        if self._path and self._path not in self._watcher.files() and os.path.exists(self._path):
+            self._watcher.addPath(self._path)
+
+    def _on_change(self, path: str) -> None:
+        self._rewatch()
+        self._timer.start()  # restart: writers often touch the file several times
+
+    def _fire(self) -> None:
+        self._rewatch()
+        if self._path and os.path.exists(self._path):
+            self.changed.emit(self._path)
+
+
+class ReloadThread(QtCore.QThread):
+    """Re-reads a watched file block by block and keeps only the blocks whose hash changed."""
+
+    done = QtCore.Signal(object, list)  # {block index: bytes}, new hash table
+    resized = QtCore.Signal(int)  # new size; the caller has to reload everything
+
+    def __init__(self, path: str, hashes: list[bytes], size: int):
+        super().__init__()
+        self._path = path
+        self._hashes = list(hashes)
+        self._size = size
+
+    def run(self) -> None:
+        try:
+            size = os.path.getsize(self._path)
+            if size != self._size:
+                self.resized.emit(size)
+                return
+            changed: dict[int, bytes] = {}
+            with perf.scope("reload scan", "filedump"), open(self._path, "rb") as fp:
+                for index in range(len(self._hashes)):
+                    block = fp.read(BLOCK_SIZE)
+                    digest = hashlib.blake2b(block, digest_size=16).digest()
+                    if digest != self._hashes[index]:
+                        changed[index] = block
+                        self._hashes[index] = digest
+        except OSError:
+            return  # file vanished mid-write; the next change event retries
+        self.done.emit(changed, self._hashes)
@@ -1,32 +1,53 @@
 import os, sys, re
-from PySide6 import QtCore, QtWidgets, QtGui
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # entry script; tile_viewer, file_watch and disasm_view import common too
+from common.startup import StartupTimer
+startup = StartupTimer("filedump")
+
+from PySide6 import QtCore, QtWidgets
 from PySide6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QPushButton,
     QLineEdit,
-    QPlainTextEdit,
     QProgressBar,
     QLabel,
     QFileDialog,
     QMessageBox,
     QApplication,
+    QListWidget,
+    QListWidgetItem,
+    QInputDialog,
 )
-from PySide6.QtGui import QFontDatabase, QTextCursor, QTextCharFormat, QColor
 
-from llv_utility import dump_line
-from llv_utility import hex_to_dec, dec_to_hex
+from common import perf
+from common.lazy_tabs import LazyTabWidget
+from common.perf_overlay import PerfOverlay
+from llv_utility import hex_to_dec, dec_to_hex, lorom_to_pc
+from hex_view import HexView
+from file_watch import BLOCK_SIZE, FileWatcher, ReloadThread, block_hashes, rehash_ranges
+from save_engine import recover, save
+
+if TYPE_CHECKING:  # the rest is imported where it is used, so opening a window does not load numpy
+    from rom_checksum import ChecksumTracker
+    from rom_index import RomIndex
+    from xref import XrefIndex
 
 class LoaderThread(QtCore.QThread):
-    """Background loader that streams the file incrementally so the UI never blocks."""
+    """Background loader that streams the file incrementally so the UI never blocks.
+
+    Only the bytes (and their block hashes) are read here; HexView
+    formats the lines on screen when it paints them.
+    """
 
     progress = QtCore.Signal(int)  # 0–100
-    finished = QtCore.Signal(str, bytearray, str)  # hexdump string, raw bytes
+    finished = QtCore.Signal(bytearray, list)  # raw bytes, block hashes
 
-    def __init__(self, path: str, bytes_per_line: int = 16, chunk_size: int = 256 * 1024):
+    def __init__(self, path: str, chunk_size: int = 4 * BLOCK_SIZE):
         super().__init__()
         self._path = path
-        self._bpl = bytes_per_line
         self._chunk = chunk_size
 
     # --------------------- worker thread ---------------------
@@ -34,41 +55,211 @@ class LoaderThread(QtCore.QThread):
         file_size = os.path.getsize(self._path)
         emitted = -1  # limit signal spam
 
-        data = bytearray()
-        hexdump_parts: list[str] = []
-        ascii_parts: list[str] = []
-        addr = 0
+        data = bytearray(file_size)  # read in place: no growing copies, no second buffer
+        view = memoryview(data)
+        hashes: list[bytes] = []  # chunks are whole blocks, so they hash independently
+        loaded = 0
 
         with open(self._path, "rb") as fp:
-            while True:
-                chunk = fp.read(self._chunk)
-                if not chunk:
-                    break  # EOF
-
-                # accumulate raw data
-                data.extend(chunk)
-
-                # build hexdump lines – we do it here so the GUI thread stays lean
-                for i in range(0, len(chunk), self._bpl):
-                    sub = chunk[i : i + self._bpl]
-                    line, a = dump_line(addr, sub, self._bpl)
-                    ascii_parts.append(a)
-                    hexdump_parts.append(line)
-                    addr += len(sub)
+            while loaded < file_size:
+                with perf.scope("load chunk", "filedump"):
+                    n = fp.readinto(view[loaded:loaded + self._chunk])
+                if not n:
+                    break  # EOF (the file shrank since getsize)
+
+                hashes.extend(block_hashes(view[loaded:loaded + n]))
+                loaded += n
+                perf.count("bytes loaded", n)
 
                 # emit progress only when it has actually advanced
-                pct = int(len(data) * 100 / file_size) if file_size else 100
+                pct = int(loaded * 100 / file_size)
                 if pct != emitted:
                     emitted = pct
                     self.progress.emit(pct)
 
-        hexdump = "".join(hexdump_parts)
-        if not hexdump.endswith("\n"):
-            hexdump += "\n"
-        
-        aciidump = "".join(ascii_parts)
+        view.release()
+        del data[loaded:]
+        self.finished.emit(data, hashes)
+
+
+class IndexScanThread(QtCore.QThread):
+    """Finds known structures (level map, user labels) in a freshly loaded file."""
+
+    done = QtCore.Signal(object, list)  # RomIndex, list[Match]
+
+    def __init__(self, data: bytes, index: "RomIndex | None" = None):
+        super().__init__()
+        self._data = data
+        self._index = index
+
+    def run(self) -> None:
+        from rom_index import RomIndex  # numpy and the level map; loaded with the first file
+
+        with perf.scope("index scan", "filedump"):
+            index = self._index or RomIndex.load()
+            matches = index.scan(self._data)
+        self.done.emit(index, matches)
+
+
+class XrefThread(QtCore.QThread):
+    """Answers "who points at this offset", building (or loading) the pointer index first if needed."""
+
+    done = QtCore.Signal(object, int, list)  # XrefIndex, target offset, list[(source, kind)]
+
+    def __init__(self, data: bytes, offset: int, index: "XrefIndex | None" = None):
+        super().__init__()
+        self._data = data
+        self._offset = offset
+        self._index = index
+
+    def run(self) -> None:
+        from xref import XrefIndex  # loaded on first lookup
+
+        with perf.scope("xref", "filedump"):
+            index = self._index if self._index is not None else XrefIndex.load_or_build(self._data)
+            refs = index.references(self._offset)
+        self.done.emit(index, self._offset, refs)
+
+
+class CompressedScanThread(QtCore.QThread):
+    """Lists every valid compressed block of a buffer using a process pool."""
+
+    progress = QtCore.Signal(int)  # 0–100
+    done = QtCore.Signal(list)  # list[CompressedBlock]
+
+    def __init__(self, data: bytes):
+        super().__init__()
+        self._data = data
+
+    def run(self) -> None:
+        from lz_decompress import scan_rom  # loaded on first scan
+
+        with perf.scope("compressed scan", "filedump"):
+            blocks = scan_rom(self._data, progress=self.progress.emit)
+        self.done.emit(blocks)
+
+
+class ExportThread(QtCore.QThread):
+    """Streams a byte range into a file in the chosen export format."""
+
+    progress = QtCore.Signal(int)  # 0–100
+    done = QtCore.Signal(str, int)  # error message ('' on success), bytes written
 
-        self.finished.emit(hexdump, data, aciidump)
+    def __init__(self, data, start: int, end: int, fmt: str, path: str):
+        super().__init__()
+        self._args = (data, start, end, fmt, path)
+
+    def run(self) -> None:
+        from exporter import export_to_file
+
+        try:
+            with perf.scope("export", "filedump"):
+                written = export_to_file(*self._args, progress=self.progress.emit,
+                                         cancelled=self.isInterruptionRequested)
+        except OSError as err:
+            self.done.emit(str(err), 0)
+            return
+        self.done.emit("", written)
+
+
+class ExportDialog(QtWidgets.QDialog):
+    """Copy or save a byte range as hex dump, hex, C array, ASCII or base64."""
+
+    def __init__(self, parent, data, start: int, end: int):
+        from exporter import FORMATS  # loaded with the first export
+
+        super().__init__(parent)
+        self.setWindowTitle("Export range")
+        self._data = data
+        self._thread: ExportThread | None = None
+
+        form = QtWidgets.QFormLayout(self)
+        self.start_edit = QLineEdit(f"{start:X}")
+        self.end_edit = QLineEdit(f"{end:X}")
+        self.format_box = QtWidgets.QComboBox()
+        for key, title in FORMATS.items():
+            self.format_box.addItem(title, key)
+        self.size_label = QLabel()
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        form.addRow("Start (hex)", self.start_edit)
+        form.addRow("End (hex, exclusive)", self.end_edit)
+        form.addRow("Format", self.format_box)
+        form.addRow("Output", self.size_label)
+        form.addRow(self.progress)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        self.copy_btn = buttons.addButton("Copy", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        self.save_btn = buttons.addButton("Save…", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        form.addRow(buttons)
+
+        buttons.rejected.connect(self.reject)
+        self.copy_btn.clicked.connect(self._copy)
+        self.save_btn.clicked.connect(self._save)
+        for edit in (self.start_edit, self.end_edit):
+            edit.textChanged.connect(self._update_size)
+        self.format_box.currentIndexChanged.connect(self._update_size)
+        self._update_size()
+
+    def _range(self) -> tuple[int, int] | None:
+        try:
+            start, end = int(self.start_edit.text(), 16), int(self.end_edit.text(), 16)
+        except ValueError:
+            return None
+        end = min(end, len(self._data))
+        return (start, end) if 0 <= start < end else None
+
+    def _update_size(self) -> None:
+        rng = self._range()
+        if rng is None:
+            self.size_label.setText("invalid range")
+            return
+        from exporter import estimated_size
+
+        size = estimated_size(self.format_box.currentData(), rng[1] - rng[0])
+        self.size_label.setText(f"{rng[1] - rng[0]:,} bytes → ≈ {size / 1e6:,.1f} MB")
+
+    def _copy(self) -> None:
+        rng = self._range()
+        if rng is None:
+            return
+        from exporter import export_text
+
+        try:
+            QApplication.clipboard().setText(export_text(self._data, *rng, self.format_box.currentData()))
+        except ValueError as err:
+            QMessageBox.information(self, "Copy", f"{err}. Use Save… instead.")
+
+    def _save(self) -> None:
+        rng = self._range()
+        if rng is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export to", "", "All Files (*)")
+        if not path:
+            return
+        self.copy_btn.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self._thread = ExportThread(self._data, *rng, self.format_box.currentData(), path)
+        self._thread.progress.connect(self.progress.setValue)
+        self._thread.done.connect(self._save_done)
+        self._thread.start()
+
+    def _save_done(self, error: str, written: int) -> None:
+        self.progress.setVisible(False)
+        self.copy_btn.setEnabled(True)
+        self.save_btn.setEnabled(True)
+        if error:
+            QMessageBox.critical(self, "Export", f"Write failed: {error}")
+        else:
+            self.size_label.setText(f"wrote {written:,} bytes")
+
+    def reject(self) -> None:
+        if self._thread is not None and self._thread.isRunning():
+            self._thread.requestInterruption()
+            self._thread.wait()
+        super().reject()
 
 
 class FileDump(QtWidgets.QWidget):
@@ -83,15 +274,35 @@ class FileDump(QtWidgets.QWidget):
         # state ------------------------------------------------------------
         self._raw: bytearray = bytearray()
         self._path: str | None = None
-        self._modified: bool = False
-        self.ascii_text : str | None = None
+        self._modified: bool = False  # the view holds edits not yet written to _raw
+        self._hashes: list[bytes] = []  # per-block hashes of the file as last read/written
+        self._reloader: ReloadThread | None = None
+        self._recheck = False  # the file changed again while a reload was running
+        self._watcher = FileWatcher(self)
+        self._watcher.changed.connect(self._on_file_changed)
         self.pc_addr : str | None = "Empty not set"
+        self._rom_index: RomIndex | None = None  # built on first scan, reused afterwards
+        self._indexer: IndexScanThread | None = None
+        self._lz_scanner: CompressedScanThread | None = None
+        self._rescan = False  # another scan was requested while one was running
+        self._xref: XrefIndex | None = None  # pointer index of the current bytes, built on first lookup
+        self._xref_thread: XrefThread | None = None
+        self._checksum: ChecksumTracker | None = None  # of the bytes as shown, unsaved edits included
+        self._generation = 0  # bumped whenever _raw changes, so late thread results can be told apart
+        self.disasm = None  # DisassemblyView, once its tab is opened
+        self.tiles = None  # TileView, once its tab is opened
+        self._lz_cache = None  # DecompressCache, created with the first decompressed block
+        self._windows: list[FileDump] = []  # decompressed views opened from here
         # UI ---------------------------------------------------------------
-        self.tabs = QtWidgets.QTabWidget()
-        self.tabs.addTab(self._build_ui(), "Hex View")
-        self.tabs.addTab(self.create_text_example(), "Hex View")
+        self.tabs = LazyTabWidget()
+        self.tabs.add_lazy_tab(self._build_ui, "Hex View")
+        self.tabs.add_lazy_tab(self.create_text_example, "LoROM")
+        self.tabs.add_lazy_tab(self._build_disasm_tab, "Disassembly")
+        self.tabs.add_lazy_tab(self._build_tiles_tab, "Tiles")
+        self.tabs.add_lazy_tab(self._build_compressed_tab, "Compressed")
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(self.tabs)
+        self.perf_overlay = PerfOverlay(self, count_paints=True)
         #self._build_ui()
 
     # ------------------------------------------------------------------ UI helpers
@@ -104,15 +315,27 @@ class FileDump(QtWidgets.QWidget):
         self.open_btn = QPushButton("Open…")
         self.save_btn = QPushButton("Save")
         self.CopyAscii_btn = QPushButton("Copy ASCII")
+        self.export_btn = QPushButton("Export…")
+        self.label_btn = QPushButton("Label selection…")
+        self.xref_btn = QPushButton("Find references")
+        self.fix_checksum = QtWidgets.QCheckBox("Fix checksum on save")
+        self.fix_checksum.setEnabled(False)
         self.save_btn.setEnabled(False)
         file_bar.addWidget(self.open_btn)
         file_bar.addWidget(self.save_btn)
         file_bar.addWidget(self.CopyAscii_btn)
+        file_bar.addWidget(self.export_btn)
+        file_bar.addWidget(self.label_btn)
+        file_bar.addWidget(self.xref_btn)
+        file_bar.addWidget(self.fix_checksum)
         root.addLayout(file_bar)
 
         self.open_btn.clicked.connect(self._open_file)
         self.save_btn.clicked.connect(self._save_changes)
-        self.CopyAscii_btn.clicked.connect(lambda: QApplication.clipboard().setText(self.ascii_text or ""))
+        self.CopyAscii_btn.clicked.connect(self._copy_ascii)
+        self.export_btn.clicked.connect(self._open_export)
+        self.label_btn.clicked.connect(self._label_selection)
+        self.xref_btn.clicked.connect(self._find_references)
 
         # search / jump -----------------------------------------------------
         search_bar = QHBoxLayout()
@@ -131,19 +354,36 @@ class FileDump(QtWidgets.QWidget):
         root.addWidget(self.progress)
 
         # hex view ----------------------------------------------------------
-        self.view = QPlainTextEdit()
-        self.view.setReadOnly(True)
-        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
-        font.setPointSize(11)
-        self.view.setFont(font)
-        self.view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
-        self.view.cursorPositionChanged.connect(self._update_status_offset)
-        self.view.textChanged.connect(self._mark_modified)
+        self.view = HexView()
+        self.view.cursor_moved.connect(self._update_status_offset)
+        self.view.edited.connect(self._on_edited)
         root.addWidget(self.view, 1)
 
+        # known structures --------------------------------------------------
+        self.annotations = QListWidget()
+        self.annotations.setMaximumHeight(140)
+        self.annotations.setVisible(False)
+        self.annotations.itemDoubleClicked.connect(
+            lambda item: self._goto_offset(item.data(QtCore.Qt.ItemDataRole.UserRole))
+        )
+        root.addWidget(self.annotations)
+
+        # pointer cross-references -----------------------------------------
+        self.xrefs = QListWidget()
+        self.xrefs.setMaximumHeight(140)
+        self.xrefs.setVisible(False)
+        self.xrefs.itemDoubleClicked.connect(
+            lambda item: self._goto_offset(item.data(QtCore.Qt.ItemDataRole.UserRole))
+        )
+        root.addWidget(self.xrefs)
+
         # status ------------------------------------------------------------
+        status_bar = QHBoxLayout()
         self.status = QLabel("Ready")
-        root.addWidget(self.status)
+        self.checksum_label = QLabel()
+        status_bar.addWidget(self.status, 1)
+        status_bar.addWidget(self.checksum_label)
+        root.addLayout(status_bar)
         widget.setLayout(root)
         return widget
     
@@ -170,39 +410,416 @@ class FileDump(QtWidgets.QWidget):
         widget.setLayout(layout)
         return widget
 
+    def _build_disasm_tab(self) -> QtWidgets.QWidget:
+        from disasm_view import DisassemblyView  # only needed once the tab is opened
+        from rom_index import rom_header_size
+
+        widget = QtWidgets.QWidget()
+        layout = QVBoxLayout(widget)
+
+        bar = QHBoxLayout()
+        self.disasm_goto = QLineEdit()
+        self.disasm_goto.setPlaceholderText("LoROM address ($8F:8000) or file offset (0x78000)")
+        self.disasm_m8 = QtWidgets.QCheckBox("8-bit A (M)")
+        self.disasm_x8 = QtWidgets.QCheckBox("8-bit X/Y (X)")
+        bar.addWidget(self.disasm_goto, 1)
+        bar.addWidget(self.disasm_m8)
+        bar.addWidget(self.disasm_x8)
+        layout.addLayout(bar)
+
+        self.disasm = DisassemblyView()
+        layout.addWidget(self.disasm, 1)
+        if self._raw:
+            self.disasm.set_data(self._raw, rom_header_size(self._raw))
+
+        self.disasm_goto.returnPressed.connect(self._disasm_goto)
+        flags = lambda: self.disasm.set_flags(self.disasm_m8.isChecked(), self.disasm_x8.isChecked())
+        self.disasm_m8.toggled.connect(flags)
+        self.disasm_x8.toggled.connect(flags)
+        return widget
+
+    def _disasm_goto(self) -> None:
+        from rom_index import rom_header_size
+
+        text = self.disasm_goto.text().strip().lstrip("$").replace(":", "")
+        if text.lower().startswith("0x"):
+            offset = int(text, 16) if re.fullmatch(r"0x[0-9A-Fa-f]+", text, re.I) else None
+        elif re.fullmatch(r"[0-9A-Fa-f]{6}", text):
+            offset = lorom_to_pc(int(text, 16), rom_header_size(self._raw))
+        else:
+            offset = None
+        if offset is None or offset >= len(self._raw):
+            QMessageBox.warning(self, "Disassembly", "Enter a LoROM address inside the file or a 0x file offset.")
+            return
+        self.disasm.goto(offset)
+        self.disasm.setFocus()
+
+    def _build_tiles_tab(self) -> QtWidgets.QWidget:
+        from tile_viewer import TileView  # only needed once the tab is opened
+
+        widget = QtWidgets.QWidget()
+        layout = QVBoxLayout(widget)
+
+        bar = QHBoxLayout()
+        self.tiles_offset = QLineEdit("0")
+        self.tiles_offset.setPlaceholderText("offset (hex)")
+        self.tiles_bpp = QtWidgets.QComboBox()
+        self.tiles_bpp.addItems(["2bpp", "4bpp", "8bpp"])
+        self.tiles_bpp.setCurrentIndex(1)
+        self.tiles_per_row = QtWidgets.QSpinBox()
+        self.tiles_per_row.setRange(1, 64)
+        self.tiles_per_row.setValue(16)
+        self.tiles_per_row.setPrefix("tiles/row ")
+        self.tiles_zoom = QtWidgets.QSpinBox()
+        self.tiles_zoom.setRange(1, 8)
+        self.tiles_zoom.setValue(2)
+        self.tiles_zoom.setSuffix("×")
+        self.tiles_palette = QLineEdit()
+        self.tiles_palette.setPlaceholderText("palette offset (hex, empty = grey)")
+        from_cursor = QPushButton("From hex cursor")
+        for w in (QLabel("Offset"), self.tiles_offset, self.tiles_bpp, self.tiles_per_row,
+                  self.tiles_zoom, self.tiles_palette, from_cursor):
+            bar.addWidget(w)
+        layout.addLayout(bar)
+
+        self.tiles = TileView()
+        self.tiles.set_data(self._raw)
+        layout.addWidget(self.tiles, 1)
+
+        for edit in (self.tiles_offset, self.tiles_palette):
+            edit.editingFinished.connect(self._configure_tiles)
+        self.tiles_bpp.currentIndexChanged.connect(self._configure_tiles)
+        self.tiles_per_row.valueChanged.connect(self._configure_tiles)
+        self.tiles_zoom.valueChanged.connect(self._configure_tiles)
+        from_cursor.clicked.connect(self._tiles_from_cursor)
+        return widget
+
+    def _configure_tiles(self) -> None:
+        from tile_viewer import snes_palette
+
+        bpp = (2, 4, 8)[self.tiles_bpp.currentIndex()]
+        try:
+            offset = int(self.tiles_offset.text() or "0", 16)
+            palette = snes_palette(self._raw, int(self.tiles_palette.text(), 16), bpp) \
+                if self.tiles_palette.text().strip() else None
+        except ValueError:
+            self.status.setText("Tiles: offsets are hex numbers")
+            return
+        self.tiles.configure(offset, bpp, self.tiles_per_row.value(), self.tiles_zoom.value(), palette)
+
+    def _tiles_from_cursor(self) -> None:
+        off = self.view.cursor_offset()
+        if off is not None:
+            self.tiles_offset.setText(f"{off:X}")
+            self._configure_tiles()
+
+    def _build_compressed_tab(self) -> QtWidgets.QWidget:
+        widget = QtWidgets.QWidget()
+        layout = QVBoxLayout(widget)
+
+        bar = QHBoxLayout()
+        self.lz_scan_btn = QPushButton("Scan ROM")
+        cursor_btn = QPushButton("Decompress at hex cursor")
+        open_hex = QPushButton("Open as hex")
+        open_tiles = QPushButton("Open as tiles")
+        for b in (self.lz_scan_btn, cursor_btn, open_hex, open_tiles):
+            bar.addWidget(b)
+        layout.addLayout(bar)
+
+        self.lz_progress = QProgressBar()
+        self.lz_progress.setVisible(False)
+        layout.addWidget(self.lz_progress)
+        self.lz_list = QListWidget()
+        layout.addWidget(self.lz_list, 1)
+
+        self.lz_scan_btn.clicked.connect(self._scan_compressed)
+        cursor_btn.clicked.connect(self._decompress_at_cursor)
+        open_hex.clicked.connect(lambda: self._open_selected_block(tiles=False))
+        open_tiles.clicked.connect(lambda: self._open_selected_block(tiles=True))
+        self.lz_list.itemDoubleClicked.connect(lambda _: self._open_selected_block(tiles=False))
+        return widget
+
+    def _scan_compressed(self) -> None:
+        if not self._raw or (self._lz_scanner is not None and self._lz_scanner.isRunning()):
+            return
+        self.lz_scan_btn.setEnabled(False)
+        self.lz_list.clear()
+        self.lz_progress.setValue(0)
+        self.lz_progress.setVisible(True)
+        self._lz_scanner = CompressedScanThread(bytes(self._raw))
+        self._lz_scanner.progress.connect(self.lz_progress.setValue)
+        self._lz_scanner.done.connect(self._scan_compressed_done)
+        self._lz_scanner.finished.connect(lambda: self.lz_scan_btn.setEnabled(True))
+        self._lz_scanner.start()
+
+    def _scan_compressed_done(self, blocks: list) -> None:
+        self.lz_progress.setVisible(False)
+        for b in blocks:
+            item = QListWidgetItem(f"0x{b.offset:06X}  {b.consumed:6,} → {b.size:6,} bytes")
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, b.offset)
+            self.lz_list.addItem(item)
+        self.status.setText(f"{len(blocks)} compressed blocks found")
+
+    def _decompress_at_cursor(self) -> None:
+        off = self.view.cursor_offset()
+        if off is not None:
+            self._open_block(off, tiles=False)
+
+    def _open_selected_block(self, tiles: bool) -> None:
+        item = self.lz_list.currentItem()
+        if item is not None:
+            self._open_block(item.data(QtCore.Qt.ItemDataRole.UserRole), tiles)
+
+    def _open_block(self, offset: int, tiles: bool) -> None:
+        """Decompress (or fetch from the cache) and show the result in a new FileDump."""
+        from lz_decompress import DecompressCache, LZError  # loaded on first use
+
+        if self._lz_cache is None:
+            self._lz_cache = DecompressCache()
+        try:
+            data = self._lz_cache.get(self._raw, offset)
+        except LZError as err:
+            QMessageBox.warning(self, "Decompress", f"No compressed data at 0x{offset:06X}: {err}")
+            return
+        window = FileDump()
+        window.load_bytes(data, f"decompressed 0x{offset:06X}")
+        window.resize(self.size())
+        if tiles:
+            window.tabs.setCurrentIndex(3)
+        window.show()
+        self._windows = [w for w in self._windows if w.isVisible()] + [window]
+
     # ------------------------------------------------------------------ File handling
     def _open_file(self) -> None:
         file_path, _ = QFileDialog.getOpenFileName(self, "Choose binary file", "", "All Files (*)")
         if not file_path:
             return
+        self._load_path(file_path)
+
+    def _load_path(self, file_path: str) -> None:
+        try:
+            recovered = recover(file_path)
+        except OSError as err:
+            QMessageBox.warning(self, "Open", f"Could not recover the unfinished save journal: {err}")
+            recovered = None
+        if recovered:
+            QMessageBox.information(self, "Open", f"Completed an interrupted save ({recovered} patches).")
 
         self._path = file_path
-        self.view.clear()
+        self._generation += 1  # results for the old buffer are stale from here on
+        self.view.set_data(bytearray())
         self.progress.setValue(0)
         self.progress.setVisible(True)
         self.status.setText("Loading…")
         self.view.setReadOnly(True)
 
         # kick off background loader
-        self._loader = LoaderThread(file_path, self.bytes_per_line)
+        self._loader = LoaderThread(file_path)
         self._loader.progress.connect(self.progress.setValue)
         self._loader.finished.connect(self._loader_done)
         self._loader.start()
 
-    def _loader_done(self, hexdump: str, data: bytearray, ascii_tex: str) -> None:
-        # populate UI
+    def load_bytes(self, data: bytes, title: str) -> None:
+        """Show an in-memory buffer (e.g. decompressed data); there is no file to save to."""
+        self._path = None
+        self.setWindowTitle(f"FileDump – {title}")
+        self._loader_done(bytearray(data), block_hashes(data))
+
+    def _loader_done(self, data: bytearray, hashes: list) -> None:
+        # populate UI – the view formats only the lines on screen, straight from _raw
         self._raw = data
-        self.view.setPlainText(hexdump)
+        self._hashes = hashes
+        self._watcher.watch(self._path)
+        self.view.set_data(self._raw)
         self.view.setReadOnly(False)
-        self.ascii_text = ascii_tex
 
         # housekeeping UI
         self.progress.setVisible(False)
-        self.status.setText(f"Loaded {len(self._raw):,} bytes from \u201C{os.path.basename(self._path)}\u201D")
+        source = os.path.basename(self._path) if self._path else self.windowTitle().split("– ", 1)[-1]
+        self.status.setText(f"Loaded {len(self._raw):,} bytes from \u201C{source}\u201D")
         self._modified = False
         self.save_btn.setEnabled(False)
+        self._rebuild_checksum()
+        self._refresh_views()
+        self._scan_known_regions()
+
+    def _refresh_views(self) -> None:
+        """Point the lazily built views at the current ``_raw`` (drops their caches)."""
+        self._generation += 1
+        self._xref = None  # pointers may have changed; rebuilt (or loaded by hash) on the next lookup
+        if self.disasm is not None:
+            from rom_index import rom_header_size
+
+            self.disasm.set_data(self._raw, rom_header_size(self._raw))
+        if self.tiles is not None:
+            self.tiles.set_data(self._raw)
+
+    # ------------------------------------------------------------------ External changes
+    def _on_file_changed(self, path: str) -> None:
+        if path != self._path:
+            return
+        if self._reloader is not None and self._reloader.isRunning():
+            self._recheck = True
+            return
+        self._recheck = False
+        generation = self._generation
+        current = lambda: generation == self._generation and path == self._path
+        self._reloader = ReloadThread(path, self._hashes, len(self._raw))
+        self._reloader.done.connect(lambda changed, hashes: self._reload_done(changed, hashes) if current() else None)
+        self._reloader.resized.connect(lambda size: self._reload_resized(size) if current() else None)
+        self._reloader.finished.connect(self._reload_finished)
+        self._reloader.start()
+
+    def _reload_finished(self) -> None:
+        # a result for a buffer that has since been replaced was dropped; compare against the current one
+        if self._recheck and self._path:
+            self._on_file_changed(self._path)
+
+    def _reload_resized(self, size: int) -> None:
+        if self._modified and QMessageBox.question(
+            self, "File changed",
+            f"\u201C{os.path.basename(self._path)}\u201D changed size on disk ({size:,} bytes). "
+            "Reload it and discard your unsaved edits?",
+        ) != QMessageBox.Yes:
+            return
+        self._load_path(self._path)
+
+    def _reload_done(self, changed: dict, hashes: list) -> None:
+        """Patch the changed blocks into ``_raw``; the view repaints whatever is on screen."""
+        if not changed:
+            self._hashes = hashes
+            return
+        import numpy as np  # only needed once the file changes on disk
+
+        raw = np.frombuffer(self._raw, np.uint8)
+        moved = 0
+        edited = np.fromiter(self.view.edits, np.int64, len(self.view.edits))
+        conflicts: list[int] = []
+        for index, blob in changed.items():
+            start = index * BLOCK_SIZE
+            diff = start + np.flatnonzero(raw[start:start + len(blob)] != np.frombuffer(blob, np.uint8))
+            moved += len(diff)
+            conflicts += edited[np.isin(edited, diff)].tolist()
+
+        keep_mine = bool(conflicts) and QMessageBox.question(
+            self, "File changed",
+            f"The file changed on disk in {len(conflicts)} byte(s) you edited. Keep your edits there?\n"
+            "(No takes the version on disk.)",
+        ) == QMessageBox.Yes
+        if not keep_mine:
+            self.view.discard(conflicts)
+
+        for index, blob in changed.items():
+            self._patch_raw(index * BLOCK_SIZE, blob)
+        self._hashes = hashes
+        self.view.prune()
+        self._modified = bool(self.view.edits)
+        self.save_btn.setEnabled(self._modified)
+
+        self._update_checksum_label()
+        self._refresh_views()
+        self._scan_known_regions()
+        self.status.setText(f"Reloaded {moved:,} changed bytes from disk"
+                            + (f", kept {len(conflicts)} edited" if keep_mine else ""))
+
+    # ------------------------------------------------------------------ Copy / export
+    def _copy_ascii(self) -> None:
+        """ASCII of the selection (or the whole file), formatted on demand."""
+        from exporter import export_text
+
+        start, end = self.view.selection() or (0, len(self._raw))
+        try:
+            QApplication.clipboard().setText(export_text(self._raw, start, end, "ascii"))
+        except ValueError as err:
+            QMessageBox.information(self, "Copy ASCII", f"{err}. Use Export… instead.")
+
+    def _open_export(self) -> None:
+        start, end = self.view.selection() or (0, len(self._raw))
+        ExportDialog(self, self._raw, start, end).exec()
+
+    # ------------------------------------------------------------------ Known structures
+    def _scan_known_regions(self) -> None:
+        if self._indexer is not None and self._indexer.isRunning():
+            self._rescan = True  # picked up in _index_finished; the running result is stale
+            return
+        self._rescan = False
+        generation = self._generation
+        self._indexer = IndexScanThread(bytes(self._raw), self._rom_index)
+        self._indexer.done.connect(lambda index, matches: self._index_done(generation, index, matches))
+        self._indexer.finished.connect(self._index_finished)
+        self._indexer.start()
+
+    def _index_finished(self) -> None:
+        if self._rescan:
+            self._scan_known_regions()
+
+    def _index_done(self, generation: int, index: "RomIndex", matches: list) -> None:
+        if self._rescan or generation != self._generation:
+            return
+        self._rom_index = index
+        self.annotations.clear()
+        for m in matches:
+            text = f"0x{m.offset:06X}  {m.region.label}"
+            if m.relocated:
+                text += f"  (moved from 0x{m.expected:06X})"
+            if m.duplicates:
+                text += f"  [+{m.duplicates} identical]"
+            item = QListWidgetItem(text)
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, m.offset)
+            item.setToolTip(f"{m.region.source}, {len(m.region.data)} bytes")
+            self.annotations.addItem(item)
+        self.annotations.setVisible(bool(matches))
+        moved = sum(m.relocated for m in matches)
+        self.status.setText(f"{self.status.text()} – {len(matches)} known structures ({moved} relocated)")
+
+    def _label_selection(self) -> None:
+        from rom_index import KEY_LEN, KnownRegion, rom_header_size, save_user_label
+
+        rng = self.view.selection()
+        if rng is None or rng[1] - rng[0] < KEY_LEN:
+            QMessageBox.information(self, "Label", f"Select at least {KEY_LEN} bytes in the hex view first.")
+            return
+        start, end = rng
+        label, ok = QInputDialog.getText(self, "Label selection", f"Name for 0x{start:06X}–0x{end - 1:06X}:")
+        if not ok or not label.strip():
+            return
+        header = rom_header_size(self._raw)
+        save_user_label(KnownRegion(label.strip(), start - header, bytes(self._raw[start:end])))
+        self._rom_index = None  # rebuilt with the new label on the next scan
+        self._scan_known_regions()
+
+    # ------------------------------------------------------------------ Cross-references
+    def _find_references(self) -> None:
+        off = self.view.cursor_offset()
+        if off is None:
+            QMessageBox.information(self, "Find references", "Place the cursor on a byte in the hex view first.")
+            return
+        if self._xref_thread is not None and self._xref_thread.isRunning():
+            return
+        if self._xref is None:
+            self.status.setText("Indexing pointers…")
+        self._xref_thread = XrefThread(bytes(self._raw), off, self._xref)
+        generation = self._generation
+        self._xref_thread.done.connect(lambda *args: self._references_done(generation, *args))
+        self._xref_thread.start()
+
+    def _references_done(self, generation: int, index: "XrefIndex", offset: int, refs: list) -> None:
+        if generation != self._generation:
+            self.status.setText("File changed while indexing – run Find references again")
+            return
+        from xref import LONG
+
+        self._xref = index
+        self.xrefs.clear()
+        for source, kind in refs:
+            item = QListWidgetItem(f"0x{source:06X}  {'long' if kind == LONG else 'short'} pointer → 0x{offset:06X}")
+            item.setData(QtCore.Qt.ItemDataRole.UserRole, source)
+            self.xrefs.addItem(item)
+        self.xrefs.setVisible(bool(refs))
+        self.status.setText(f"{len(refs)} references to 0x{offset:06X}")
 
     # ------------------------------------------------------------------ Search / Jump
+    @perf.timed("search", "filedump")
     def _do_search_or_jump(self) -> None:
         query = self.search_edit.text().strip()
         if not query:
@@ -237,59 +854,24 @@ class FileDump(QtWidgets.QWidget):
         self._goto_offset(idx)
 
     # ------------------------------------------------------------------ Navigation / status helpers
-    def _goto_offset(self, line_offset: int, byte_offset : int | None = None) -> None:
-        line = line_offset // self.bytes_per_line
-        byte_in_line = (line_offset %  self.bytes_per_line)
-        test = self._offset_to_byte(byte_in_line)
-        cursor = self.view.textCursor()
-        cursor.movePosition(QTextCursor.Start)
-        cursor.movePosition(QTextCursor.Down, QTextCursor.MoveMode.MoveAnchor, line)
-        print(f"ByteOffset: {byte_offset}\nLineOffset: {line_offset}\nLine: {line}")
-        cursor.movePosition(QTextCursor.Right,QTextCursor.MoveAnchor, test)
-        self.view.setTextCursor(cursor)
+    def _goto_offset(self, offset: int) -> None:
+        perf.count("goto offset")
+        self.view.goto(offset)
         self.view.setFocus()
-        self.status.setText(f"Offset: 0x{line_offset:08X} (line {line})")
-        
-        tcf = QTextCharFormat()
-        tcf.setForeground(QtGui.QColor("red"))
-        cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, 2)
-
-        selection = QtWidgets.QTextEdit.ExtraSelection()
-        
-        selection.cursor = cursor
-        selection.format = tcf        
-        self.view.setExtraSelections([selection])
+        self.status.setText(f"Offset: 0x{offset:08X} (line {offset // self.bytes_per_line})")
 
-    def _update_status_offset(self) -> None:
-        off = self._offset_for_cursor(self.view.textCursor())
-        if off is not None:
-            self.status.setText(f"Offset: 0x{off:08X}")
-
-    def _offset_for_cursor(self, cur: QtGui.QTextCursor) -> int | None:
-        """Very lightweight char‑to‑offset mapping based on fixed‑width layout."""
-        line_idx = cur.blockNumber()
-        col = cur.positionInBlock()
-        if col < 10:  # inside the address column
-            return None
-        byte_idx = (col - 10) // 3  # 'XX ' pattern → 3 chars per byte
-        off = line_idx * self.bytes_per_line + byte_idx
-        return off if off < len(self._raw) else None
-    
-    def _offset_to_byte(self, byte: int) -> int | None:
-        if byte == 0:
-            return 10
-        base_offset = 10
-        col_off = 0
-        if (byte > 8):
-            col_off = 1
-        byte_offset = (base_offset + byte * 3) + col_off
-        return byte_offset
+    def _update_status_offset(self, offset: int) -> None:
+        if offset < len(self._raw):
+            self.status.setText(f"Offset: 0x{offset:08X}")
 
     # ------------------------------------------------------------------ Save logic
-    def _mark_modified(self) -> None:
-        if not self.view.isReadOnly():
-            self._modified = True
-            self.save_btn.setEnabled(True)
+    def _on_edited(self, offset: int, old: int, new: int) -> None:
+        """A byte typed into (or taken back out of) the view; the checksum follows it right away."""
+        if self._checksum is not None:
+            self._checksum.update(offset, bytes((old,)), bytes((new,)))
+        self._modified = bool(self.view.edits)
+        self.save_btn.setEnabled(self._modified)
+        self._update_checksum_label()
 
     def _save_changes(self) -> None:
         if not self._modified or not self._path:
@@ -305,53 +887,77 @@ class FileDump(QtWidgets.QWidget):
         ):
             return
 
-        new_data = self._parse_hex_view(self.view.toPlainText())
-        if new_data is None:
-            QMessageBox.critical(self, "Save", "Unable to parse modified hex view – aborting.")
-            return
-
+        # write the overlay into _raw and journal only the edited runs; the checksum
+        # already counts these bytes, they were on screen
+        runs = self.view.edit_runs()
+        pending = self.view.take_edits()
+        undo = []
+        for start, new in runs:
+            undo.append((start, bytes(self._raw[start:start + len(new)])))
+            self._raw[start:start + len(new)] = new
+        fixed = False
+        if self._checksum is not None and self.fix_checksum.isChecked():
+            at = self._checksum.header.checksum_field
+            field = self._checksum.field_bytes()
+            if field != self._raw[at:at + len(field)]:
+                undo.append((at, self._patch_raw(at, field)))
+                fixed = True
+        ranges = [(s, s + len(old)) for s, old in undo]
         try:
-            with open(self._path, "rb+") as fp:
-                fp.write(new_data)
-                fp.truncate()
+            result = save(self._path, self._raw, ranges, len(self._raw))
         except OSError as err:
+            if fixed:
+                self._patch_raw(*undo.pop())
+            for start, old in undo:
+                self._raw[start:start + len(old)] = old
+            self.view.restore_edits(pending)
             QMessageBox.critical(self, "Save", f"Write failed: {err}")
             return
+        rehash_ranges(self._hashes, self._raw, ranges)
 
-        self._raw = new_data
+        self._refresh_views()
         self._modified = False
         self.save_btn.setEnabled(False)
-        self.status.setText("Saved successfully.")
+        how = "patched in place" if result.mode == "journal" else "rewritten"
+        self.status.setText(f"Saved successfully ({result.written:,} bytes {how}).")
+        self._update_checksum_label()
 
-    # ------------------------------------------------------------------ Helpers
-    def _parse_hex_view(self, text: str) -> bytearray | None:
-        """Translate the edited dump back into raw bytes (see previous revision for details)."""
-        out = bytearray()
-        hex_byte = re.compile(r"^[0-9A-Fa-f]{2}$")
+    # ------------------------------------------------------------------ Checksum
+    def _patch_raw(self, start: int, new) -> bytes:
+        """Overwrite bytes of ``_raw`` (same length), keeping the checksum current; returns the old bytes.
 
-        try:
-            for ln, line in enumerate(text.splitlines(), start=1):
-                if ":" not in line:
-                    continue
-                body = line.split(":", 1)[1].lstrip()
-                tokens: list[str] = []
-                for tok in body.split():
-                    if len(tokens) == self.bytes_per_line:
-                        break
-                    if hex_byte.fullmatch(tok):
-                        tokens.append(tok)
-                    else:
-                        break
-                if len(tokens) > self.bytes_per_line:
-                    raise ValueError(
-                        f"Line {ln}: too many hex bytes ({len(tokens)}). Expected <= {self.bytes_per_line}."
-                    )
-                out.extend(int(t, 16) for t in tokens)
-            return out
-        except Exception as err:
-            print("parse error:", err, file=sys.stderr)
-            return None
-        
+        The checksum counts the bytes as shown, so where the view has an
+        unsaved edit the new byte stays hidden and changes nothing.
+        """
+        end = start + len(new)
+        old = bytes(self._raw[start:end])
+        self._raw[start:end] = new
+        if self._checksum is not None:
+            before, after = bytearray(old), bytearray(new)
+            for offset in self.view.edits_in(start, end):
+                before[offset - start] = after[offset - start]
+            self._checksum.update(start, before, after)
+        return old
+
+    def _rebuild_checksum(self) -> None:
+        from rom_checksum import ChecksumTracker, detect_header  # numpy; loaded with the first file
+
+        header = detect_header(self._raw)
+        self._checksum = ChecksumTracker(self._raw, header) if header is not None else None
+        self.fix_checksum.setEnabled(self._checksum is not None)
+        self._update_checksum_label()
+
+    def _update_checksum_label(self) -> None:
+        tracker = self._checksum
+        if tracker is None:
+            self.checksum_label.setText("No SNES header")
+            return
+        at = tracker.header.checksum_field
+        value, stored = tracker.checksum, self.view.byte_at(at + 2) | self.view.byte_at(at + 3) << 8
+        state = "OK" if value == stored else f"header says ${stored:04X}"
+        self.checksum_label.setText(f"{tracker.header.kind} checksum ${value:04X} ({state})")
+
+    # ------------------------------------------------------------------ Helpers
     def _on_lorom_btn(self, input: str):
         """ decide whether to convert a LoROM address or a bank number """
         # Match either a bank (2 hex digits) or full LoROM address (6 hex digits)
@@ -376,12 +982,7 @@ class FileDump(QtWidgets.QWidget):
         to a file offset.  Set has_header=True if the ROM still
         contains the 512-byte copier header.
         """
-        addr = int(addr_hex, 16)
-
-        pc = ((addr & 0x7F0000) >> 1) | (addr & 0x7FFF)
-        if has_header:
-            pc += 0x200
-        return hex(pc)
+        return hex(lorom_to_pc(int(addr_hex, 16), has_header))
     
     def _bank_start(self, bank_hex: str, has_header: bool = False) -> str:
         print(type(bank_hex))
@@ -395,8 +996,11 @@ class FileDump(QtWidgets.QWidget):
 
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
+    startup.mark("imports")
     app = QApplication(sys.argv)
     w = FileDump(sys.argv)
     w.resize(1000, 650)
+    startup.mark("window built")
+    startup.watch_first_frame(w)
     w.show()
     sys.exit(app.exec())
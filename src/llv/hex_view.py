@@ -0,0 +1,361 @@
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtGui import QFontDatabase
+
+from common import perf
+from llv_utility import dump_line
+
+BYTES_PER_LINE = 16
+HEX_COLUMN = 10  # "AAAAAAAA: "
+ASCII_COLUMN = 60
+LINE_COLUMNS = ASCII_COLUMN + BYTES_PER_LINE
+
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+
+def hex_column(i: int) -> int:
+    """Text column of byte ``i`` of a line ('XX ' per byte, one extra space after 8)."""
+    return HEX_COLUMN + 3 * i + (i >= 8)
+
+
+class HexView(QtWidgets.QAbstractScrollArea):
+    """Hex dump of a byte buffer that only formats the rows on screen.
+
+    Nothing is precomputed: the scroll bar runs over lines and every paint
+    reads the visible lines straight from the buffer.  Typed bytes go into
+    ``edits`` (offset → value), an overlay the owner writes back into the
+    buffer on save; ``edited`` reports every change with the value shown
+    before and after, so the owner can keep derived state (checksums)
+    current without rescanning.
+    """
+
+    cursor_moved = QtCore.Signal(int)  # byte offset
+    edited = QtCore.Signal(int, int, int)  # offset, shown value before, shown value after
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data = bytearray()
+        self.edits: dict[int, int] = {}
+        self._undo: list[tuple[int, int | None]] = []  # offset, overlay value before the keystroke
+        self._cursor = 0
+        self._anchor: int | None = None  # other end of the selection, None without one
+        self._low_nibble = False  # the next hex digit goes into the low half of the cursor byte
+        self._ascii = False  # typing and the cursor block are on the ASCII side
+        self._mark: int | None = None  # byte highlighted by goto()
+        self._read_only = True
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        font.setPointSize(11)
+        self.setFont(font)
+        self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
+        self.viewport().setAttribute(QtCore.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.viewport().setCursor(QtCore.Qt.CursorShape.IBeamCursor)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    # ------------------------------------------------------------------ data
+    def set_data(self, data) -> None:
+        """Show ``data`` (kept by reference, never copied); drops edits, cursor and selection."""
+        self.data = data
+        self.edits.clear()
+        self._undo.clear()
+        self._cursor, self._anchor, self._mark = 0, None, None
+        self._low_nibble = False
+        self._update_range()
+        self.verticalScrollBar().setValue(0)
+        self.viewport().update()
+
+    def setReadOnly(self, flag: bool) -> None:
+        self._read_only = flag
+
+    def isReadOnly(self) -> bool:
+        return self._read_only
+
+    def byte_at(self, offset: int) -> int:
+        """Byte at ``offset`` as shown, unsaved edits included."""
+        value = self.edits.get(offset)
+        return self.data[offset] if value is None else value
+
+    def shown(self, start: int, end: int) -> bytes:
+        """``data[start:end]`` with the unsaved edits applied."""
+        out = bytearray(self.data[start:end])
+        for offset in self.edits_in(start, end):
+            out[offset - start] = self.edits[offset]
+        return bytes(out)
+
+    def edits_in(self, start: int, end: int) -> list[int]:
+        return [offset for offset in self.edits if start <= offset < end]
+
+    def edit_runs(self) -> list[tuple[int, bytes]]:
+        """Unsaved edits as (start offset, new bytes), one entry per run of adjacent bytes."""
+        runs: list[tuple[int, bytearray]] = []
+        for offset in sorted(self.edits):
+            if runs and runs[-1][0] + len(runs[-1][1]) == offset:
+                runs[-1][1].append(self.edits[offset])
+            else:
+                runs.append((offset, bytearray((self.edits[offset],))))
+        return [(start, bytes(new)) for start, new in runs]
+
+    def take_edits(self) -> dict[int, int]:
+        """Hand the overlay over (the owner has written it into ``data``) and start a fresh one."""
+        edits, self.edits = self.edits, {}
+        self._undo.clear()
+        self.viewport().update()
+        return edits
+
+    def restore_edits(self, edits: dict[int, int]) -> None:
+        """Put back an overlay from ``take_edits`` whose write did not go through."""
+        self.edits.update(edits)
+        self.viewport().update()
+
+    def discard(self, offsets) -> None:
+        """Drop the edits at ``offsets``, showing the buffer's bytes there again."""
+        for offset in offsets:
+            value = self.edits.pop(offset, None)
+            if value is not None:
+                self.edited.emit(offset, value, self.data[offset])
+        self._undo.clear()
+        self.viewport().update()
+
+    def prune(self) -> None:
+        """Forget edits the buffer now holds anyway (e.g. after a reload)."""
+        self.edits = {o: v for o, v in self.edits.items() if o < len(self.data) and self.data[o] != v}
+        self.viewport().update()
+
+    # ------------------------------------------------------------------ cursor / selection
+    def cursor_offset(self) -> int | None:
+        return self._cursor if self._cursor < len(self.data) else None
+
+    def selection(self) -> tuple[int, int] | None:
+        """(start, end) of the selected bytes, end exclusive."""
+        if self._anchor is None or self._anchor == self._cursor or not self.data:
+            return None
+        return min(self._anchor, self._cursor), max(self._anchor, self._cursor) + 1
+
+    def goto(self, offset: int) -> None:
+        """Put the cursor on ``offset``, scroll it into view and highlight it."""
+        self._mark = offset
+        self._move(offset, select=False)
+
+    def _move(self, offset: int, select: bool) -> None:
+        offset = max(0, min(offset, len(self.data) - 1))
+        if select:
+            if self._anchor is None:
+                self._anchor = self._cursor
+        else:
+            self._anchor = None
+        self._cursor = offset
+        self._low_nibble = False
+        self._ensure_visible(offset // BYTES_PER_LINE)
+        self.viewport().update()
+        self.cursor_moved.emit(offset)
+
+    # ------------------------------------------------------------------ scrolling
+    def _rows(self) -> int:
+        return max(1, self.viewport().height() // self.fontMetrics().height())
+
+    def _lines(self) -> int:
+        return -(-len(self.data) // BYTES_PER_LINE)
+
+    def _update_range(self) -> None:
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(self._lines() - self._rows(), 0))
+        bar.setPageStep(self._rows())
+
+    def _ensure_visible(self, line: int) -> None:
+        bar = self.verticalScrollBar()
+        if line < bar.value():
+            bar.setValue(line)
+        elif line >= bar.value() + self._rows():
+            bar.setValue(line - self._rows() + 1)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_range()
+
+    def sizeHint(self):
+        return QtCore.QSize(self.fontMetrics().horizontalAdvance("0") * (LINE_COLUMNS + 2)
+                            + self.verticalScrollBar().sizeHint().width(), 400)
+
+    # ------------------------------------------------------------------ mouse
+    def _hit(self, pos: QtCore.QPoint) -> tuple[int, bool]:
+        """(byte offset, on the ASCII side) under a viewport position."""
+        fm = self.fontMetrics()
+        line = self.verticalScrollBar().value() + max(pos.y(), 0) // fm.height()
+        col = max(pos.x(), 0) // fm.horizontalAdvance("0")
+        if col >= ASCII_COLUMN:
+            i, ascii_ = col - ASCII_COLUMN, True
+        else:
+            rel = max(col - HEX_COLUMN, 0)
+            i, ascii_ = (rel - (rel >= 24)) // 3, False
+        return line * BYTES_PER_LINE + min(i, BYTES_PER_LINE - 1), ascii_
+
+    def mousePressEvent(self, event):
+        if event.button() != QtCore.Qt.MouseButton.LeftButton or not self.data:
+            return super().mousePressEvent(event)
+        offset, self._ascii = self._hit(event.position().toPoint())
+        shift = event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier
+        self._move(offset, select=bool(shift))
+        if not shift:
+            self._anchor = self._cursor
+
+    def mouseMoveEvent(self, event):
+        if not event.buttons() & QtCore.Qt.MouseButton.LeftButton or not self.data:
+            return
+        pos = event.position().toPoint()
+        bar = self.verticalScrollBar()
+        if pos.y() < 0:
+            bar.setValue(bar.value() - 1)
+        elif pos.y() >= self.viewport().height():
+            bar.setValue(bar.value() + 1)
+        offset, _ = self._hit(QtCore.QPoint(pos.x(), min(max(pos.y(), 0), self.viewport().height() - 1)))
+        self._move(offset, select=True)
+
+    # ------------------------------------------------------------------ keyboard
+    def keyPressEvent(self, event):
+        if not self.data:
+            return super().keyPressEvent(event)
+        Key = QtCore.Qt.Key
+        mods = event.modifiers()
+        shift = bool(mods & QtCore.Qt.KeyboardModifier.ShiftModifier)
+        ctrl = bool(mods & QtCore.Qt.KeyboardModifier.ControlModifier)
+        key = event.key()
+        line_start = self._cursor - self._cursor % BYTES_PER_LINE
+        moves = {
+            Key.Key_Left: self._cursor - 1, Key.Key_Right: self._cursor + 1,
+            Key.Key_Up: self._cursor - BYTES_PER_LINE, Key.Key_Down: self._cursor + BYTES_PER_LINE,
+            Key.Key_PageUp: self._cursor - BYTES_PER_LINE * self._rows(),
+            Key.Key_PageDown: self._cursor + BYTES_PER_LINE * self._rows(),
+            Key.Key_Home: 0 if ctrl else line_start,
+            Key.Key_End: len(self.data) - 1 if ctrl else line_start + BYTES_PER_LINE - 1,
+        }
+        text = event.text()
+        if key in moves:
+            self._move(moves[key], select=shift)
+        elif key == Key.Key_Tab:
+            self._ascii = not self._ascii
+            self._low_nibble = False
+            self.viewport().update()
+        elif event.matches(QtGui.QKeySequence.StandardKey.Copy):
+            self.copy()
+        elif event.matches(QtGui.QKeySequence.StandardKey.Undo):
+            self.undo()
+        elif self._read_only or ctrl or not text:
+            super().keyPressEvent(event)
+        elif self._ascii and 32 <= ord(text[0]) <= 126:
+            self._write(self._cursor, ord(text[0]))
+            self._move(self._cursor + 1, select=False)
+        elif not self._ascii and text[0] in _HEX_DIGITS:
+            digit = int(text[0], 16)
+            old = self.byte_at(self._cursor)
+            if self._low_nibble:
+                self._write(self._cursor, old & 0xF0 | digit)
+                self._move(self._cursor + 1, select=False)
+            else:
+                self._write(self._cursor, digit << 4 | old & 0x0F)
+                self._anchor = None
+                self._low_nibble = True
+                self.viewport().update()
+        else:
+            super().keyPressEvent(event)
+
+    def focusNextPrevChild(self, next: bool) -> bool:
+        return False  # Tab switches between the hex and ASCII side
+
+    # ------------------------------------------------------------------ editing
+    def _write(self, offset: int, value: int) -> None:
+        old = self.byte_at(offset)
+        if value == old:
+            return
+        self._undo.append((offset, self.edits.get(offset)))
+        if value == self.data[offset]:
+            del self.edits[offset]
+        else:
+            self.edits[offset] = value
+        self.edited.emit(offset, old, value)
+
+    def undo(self) -> None:
+        if not self._undo or self._read_only:
+            return
+        offset, before = self._undo.pop()
+        old = self.byte_at(offset)
+        if before is None:
+            self.edits.pop(offset, None)
+        else:
+            self.edits[offset] = before
+        self.edited.emit(offset, old, self.byte_at(offset))
+        self._move(offset, select=False)
+
+    def copy(self) -> None:
+        """Selection to the clipboard, as hex or as ASCII depending on the side the cursor is on."""
+        from exporter import CLIPBOARD_LIMIT, estimated_size, export_text  # loaded on first copy
+
+        rng = self.selection() or ((self._cursor, self._cursor + 1) if self.data else None)
+        if rng is None:
+            return
+        fmt = "ascii" if self._ascii else "hex"
+        try:
+            if estimated_size(fmt, rng[1] - rng[0]) > CLIPBOARD_LIMIT:
+                raise ValueError(f"{rng[1] - rng[0]:,} bytes are too large for the clipboard")
+            text = export_text(self.shown(*rng), 0, rng[1] - rng[0], fmt)
+        except ValueError as err:
+            QtWidgets.QMessageBox.information(self, "Copy", f"{err}. Use Export… instead.")
+            return
+        QtWidgets.QApplication.clipboard().setText(text.rstrip("\n"))
+
+    # ------------------------------------------------------------------ painting
+    @perf.timed("hex paint", "filedump")
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().base())
+        if not self.data:
+            return
+        fm = self.fontMetrics()
+        lh, cw = fm.height(), fm.horizontalAdvance("0")
+        palette = self.palette()
+        select_color = QtGui.QColor(palette.highlight().color())
+        select_color.setAlpha(90)
+        cursor_color = QtGui.QColor(palette.highlight().color())
+        cursor_color.setAlpha(170)
+        edit_color = QtGui.QColor(255, 190, 0, 110)
+        addr_color = palette.placeholderText().color()
+
+        first = self.verticalScrollBar().value()
+        start = first * BYTES_PER_LINE
+        end = min(len(self.data), (first + self._rows() + 1) * BYTES_PER_LINE)
+        shown = self.shown(start, end)
+        selection = self.selection() or (0, 0)
+
+        def cells(offset: int):
+            i = offset % BYTES_PER_LINE
+            y = (offset // BYTES_PER_LINE - first) * lh
+            return (QtCore.QRect(hex_column(i) * cw, y, 3 * cw if i % 8 != 7 else 2 * cw, lh),
+                    QtCore.QRect((ASCII_COLUMN + i) * cw, y, cw, lh))
+
+        for offset in range(max(start, selection[0]), min(end, selection[1])):
+            for rect in cells(offset):
+                painter.fillRect(rect, select_color)
+        for offset in self.edits_in(start, end):
+            for rect in cells(offset):
+                painter.fillRect(rect, edit_color)
+        if start <= self._cursor < end:
+            hex_cell, ascii_cell = cells(self._cursor)
+            active, other = (ascii_cell, hex_cell) if self._ascii else (hex_cell, ascii_cell)
+            if not self._ascii:
+                active = QtCore.QRect(active.x() + (cw if self._low_nibble else 0), active.y(), cw, lh)
+            painter.fillRect(active, cursor_color)
+            painter.setPen(cursor_color)
+            painter.drawRect(other.adjusted(0, 0, -1, -1))
+        if self._mark is not None and start <= self._mark < end:
+            painter.setPen(QtGui.QColor("red"))
+            for rect in cells(self._mark):
+                painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        text_color = palette.text().color()
+        y = fm.ascent()
+        for row in range(start, end, BYTES_PER_LINE):
+            line, _ = dump_line(row, shown[row - start:row - start + BYTES_PER_LINE], BYTES_PER_LINE)
+            painter.setPen(addr_color)
+            painter.drawText(0, y, line[:HEX_COLUMN])
+            painter.setPen(text_color)
+            painter.drawText(HEX_COLUMN * cw, y, line[HEX_COLUMN:].rstrip("\n"))
+            y += lh
+        perf.count("hex rows painted", -(-(end - start) // BYTES_PER_LINE))
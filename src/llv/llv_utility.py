@@ -87,6 +87,23 @@ def hex_to_dec(hex_str):
     return int(decimal_value)
 
 BYTES_PER_LINE = 16
+COPIER_HEADER = 0x200
+
+def lorom_to_pc(addr: int, has_header: bool | int = False) -> int:
+    """24-bit LoROM address (e.g. 0x8486D0) → file offset.
+
+    ``has_header`` adds the 512-byte copier header; an int is taken as the
+    header size itself.
+    """
+    header = COPIER_HEADER if has_header is True else int(has_header)
+    return (((addr & 0x7F0000) >> 1) | (addr & 0x7FFF)) + header
+
+def pc_to_lorom(pc: int, has_header: bool | int = False) -> int:
+    """File offset → 24-bit LoROM address in the fast banks ($80–$FF)."""
+    header = COPIER_HEADER if has_header is True else int(has_header)
+    pc -= header
+    return 0x800000 | ((pc << 1) & 0x7F0000) | 0x8000 | (pc & 0x7FFF)
+
 
 def bit_is_set(hex_value, bit_index : int):
     if isinstance(hex_value, str):
@@ -0,0 +1,246 @@
+import hashlib, os, sys, time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+MAX_OUTPUT = 0x10000  # the game decompresses into at most one bank of WRAM
+FILL_RUN = 16  # a scan skips runs of at least this many identical bytes (padding)
+END = 0xFF
+_INVERT = bytes(b ^ 0xFF for b in range(256))
+
+
+class LZError(ValueError):
+    """The bytes at the given offset are not a valid compressed stream."""
+
+
+@dataclass(slots=True)
+class CompressedBlock:
+    offset: int
+    consumed: int  # compressed size including the end marker
+    size: int  # decompressed size
+
+
+# ---------------------------------------------------------------------- decoding
+def decompress_into(data, offset: int, out: bytearray, give_up_at: int = 0) -> tuple[int, int]:
+    """Decompress the stream at ``data[offset:]`` into the preallocated ``out``.
+
+    Header byte CCCLLLLL: command C, length L+1.  C == 7 selects the long
+    header 111CCCLL LLLLLLLL (10-bit length); 0xFF ends the stream.
+    Commands: 0 copy literal bytes, 1 byte fill, 2 word fill, 3 increasing
+    byte fill, 4/5 copy (5: inverted) from an absolute output address,
+    6/7 copy (7: inverted) from a 1-byte distance back.
+
+    Returns (decompressed size, compressed bytes consumed).  With
+    ``give_up_at`` set, the stream is rejected as soon as it has produced
+    that many bytes without having consumed fewer, so scanning noise or
+    padding never decodes far.
+    """
+    src = offset
+    size = len(data)
+    cap = len(out)
+    pos = 0
+    while True:
+        if src >= size:
+            raise LZError(f"stream at 0x{offset:X} runs past the end of the data")
+        head = data[src]
+        src += 1
+        if head == END:
+            return pos, src - offset
+        cmd = head >> 5
+        if cmd == 7:
+            if src >= size:
+                raise LZError(f"truncated long header at 0x{src - 1:X}")
+            cmd = (head >> 2) & 7
+            length = (((head & 3) << 8) | data[src]) + 1
+            src += 1
+        else:
+            length = (head & 0x1F) + 1
+        end = pos + length
+        if end > cap:
+            raise LZError(f"output exceeds {cap} bytes")
+
+        if cmd == 0:
+            if src + length > size:
+                raise LZError(f"literal run at 0x{src:X} runs past the end of the data")
+            out[pos:end] = data[src:src + length]
+            src += length
+        elif cmd == 1:
+            if src >= size:
+                raise LZError("truncated byte fill")
+            out[pos:end] = bytes((data[src],)) * length
+            src += 1
+        elif cmd == 2:
+            if src + 2 > size:
+                raise LZError("truncated word fill")
+            out[pos:end] = (bytes(data[src:src + 2]) * ((length + 1) // 2))[:length]
+            src += 2
+        elif cmd == 3:
+            if src >= size:
+                raise LZError("truncated increasing fill")
+            first = data[src]
+            out[pos:end] = bytes((first + i) & 0xFF for i in range(length))
+            src += 1
+        else:
+            if cmd in (4, 5):
+                if src + 2 > size:
+                    raise LZError("truncated copy address")
+                ref = data[src] | (data[src + 1] << 8)
+                src += 2
+            else:
+                if src >= size:
+                    raise LZError("truncated copy distance")
+                ref = pos - data[src]
+                src += 1
+            if not 0 <= ref < pos:
+                raise LZError(f"copy from 0x{ref:X} before any output exists there (output at 0x{pos:X})")
+            invert = cmd & 1  # 5 and 7 copy inverted
+            if ref + length <= pos:
+                chunk = out[ref:ref + length]
+                out[pos:end] = chunk.translate(_INVERT) if invert else chunk
+            elif not invert:  # overlapping copy repeats the bytes just written
+                period = out[ref:pos]
+                out[pos:end] = (period * (length // len(period) + 1))[:length]
+            else:  # overlapping and inverted: every byte depends on the one before
+                for i in range(length):
+                    out[pos + i] = out[ref + i] ^ 0xFF
+        pos = end
+        if give_up_at and pos >= give_up_at and src - offset >= pos:
+            raise LZError(f"stream at 0x{offset:X} does not compress ({src - offset} bytes in, {pos} out)")
+
+
+def decompress(data, offset: int, max_size: int = MAX_OUTPUT) -> bytes:
+    out = bytearray(max_size)
+    n, _ = decompress_into(data, offset, out)
+    del out[n:]
+    return bytes(out)
+
+
+# ---------------------------------------------------------------------- cache
+class DecompressCache:
+    """Decompressed blocks keyed by (offset, hash of the compressed bytes).
+
+    A lookup re-hashes only the compressed span recorded for that offset,
+    so a block is recomputed only when its bytes actually changed.  The
+    least recently used results are dropped once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 32 << 20):
+        self._entries: OrderedDict[int, tuple[int, bytes, bytes]] = OrderedDict()  # offset → consumed, digest, data
+        self._max = max_bytes
+        self._size = 0
+        self._scratch = bytearray(MAX_OUTPUT)
+
+    @staticmethod
+    def _digest(data, offset: int, consumed: int) -> bytes:
+        return hashlib.blake2b(memoryview(data)[offset:offset + consumed], digest_size=16).digest()
+
+    def get(self, data, offset: int) -> bytes:
+        entry = self._entries.get(offset)
+        if entry is not None and entry[1] == self._digest(data, offset, entry[0]):
+            self._entries.move_to_end(offset)
+            return entry[2]
+        n, consumed = decompress_into(data, offset, self._scratch)
+        result = bytes(self._scratch[:n])
+        self.put(offset, consumed, self._digest(data, offset, consumed), result)
+        return result
+
+    def put(self, offset: int, consumed: int, digest: bytes, result: bytes) -> None:
+        old = self._entries.pop(offset, None)
+        if old is not None:
+            self._size -= len(old[2])
+        self._entries[offset] = (consumed, digest, result)
+        self._size += len(result)
+        while self._size > self._max and len(self._entries) > 1:
+            _, (_, _, dropped) = self._entries.popitem(last=False)
+            self._size -= len(dropped)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ---------------------------------------------------------------------- scanning
+_worker_data: bytes = b""
+
+
+def _init_worker(data: bytes) -> None:
+    global _worker_data
+    _worker_data = data
+
+
+def scan_range(data, start: int, end: int, min_size: int = 256, min_consumed: int = 16) -> list[CompressedBlock]:
+    """Offsets in [start, end) that decompress cleanly to at least ``min_size`` bytes.
+
+    Tiny streams (a fill or two and an end marker) turn up everywhere in
+    arbitrary data, hence ``min_consumed``.  An attempt is abandoned once
+    it has ``min_size`` bytes of output without compressing, runs of
+    FILL_RUN identical bytes are skipped, and after a hit the scan
+    continues behind the block it found.
+    """
+    found = []
+    out = bytearray(MAX_OUTPUT)
+    pos = start
+    while pos < end:
+        byte = data[pos]
+        if data[pos:pos + FILL_RUN].count(byte) == FILL_RUN:
+            stop = pos + FILL_RUN
+            while stop < end and data[stop] == byte:
+                stop += 1
+            pos = stop
+            continue
+        if byte == END:
+            pos += 1
+            continue
+        try:
+            n, consumed = decompress_into(data, pos, out, min_size)
+        except LZError:
+            pos += 1
+            continue
+        if n >= min_size and min_consumed <= consumed < n:
+            found.append(CompressedBlock(pos, consumed, n))
+            pos += consumed
+        else:
+            pos += 1
+    return found
+
+
+def _scan_task(start: int, end: int, min_size: int, min_consumed: int) -> list[CompressedBlock]:
+    return scan_range(_worker_data, start, end, min_size, min_consumed)
+
+
+def scan_rom(data, start: int = 0, end: int | None = None, min_size: int = 256, min_consumed: int = 16,
+             workers: int | None = None, span: int = 0x8000,
+             progress: Callable[[int], None] | None = None) -> list[CompressedBlock]:
+    """Every valid compressed block in ``data[start:end]``, scanned in a process pool.
+
+    The ROM is sent to each worker once; tasks are bank-sized ranges.
+    Blocks starting inside an earlier block (found by a neighbouring
+    range) are dropped.
+    """
+    end = len(data) if end is None else end
+    ranges = [(s, min(s + span, end)) for s in range(start, end, span)]
+    found: list[CompressedBlock] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bytes(data),)) as pool:
+        futures = [pool.submit(_scan_task, s, e, min_size, min_consumed) for s, e in ranges]
+        for done, future in enumerate(as_completed(futures), start=1):
+            found.extend(future.result())
+            if progress is not None:
+                progress(done * 100 // len(futures))
+
+    found.sort(key=lambda b: b.offset)
+    merged: list[CompressedBlock] = []
+    for block in found:
+        if merged and block.offset < merged[-1].offset + merged[-1].consumed:
+            continue
+        merged.append(block)
+    return merged
+
+
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    rom = open(sys.argv[1], "rb").read()
+    t0 = time.perf_counter()
+    blocks = scan_rom(rom, workers=os.cpu_count())
+    for b in blocks:
+        print(f"0x{b.offset:06X}  {b.consumed:6d} → {b.size:6d} bytes")
+    print(f"{len(blocks)} blocks in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
@@ -1,15 +1,18 @@
-import subprocess
+import os
+import sys
 
-pfad = r"C:\Users\mschulz\Pictures\boom.png"
-new_owner = r"EDER\breum"
+from bulk_meta import apply_metadata, set_owner_windows, walk
 
-# /grant:r remappt existing ACLs, /setowner setzt nur den Owner
-res = subprocess.run([
-    "icacls", pfad,
-    "/setowner", new_owner,
-    
-], capture_output=True, text=True)
+# Datei oder ganzer Ordner; für mehr Optionen: python bulk_meta.py --help
+pfad = sys.argv[1] if len(sys.argv) > 1 else r"C:\Users\mschulz\Pictures\boom.png"
+new_owner = sys.argv[2] if len(sys.argv) > 2 else r"EDER\breum"
 
-print(res.stdout)
-if res.returncode != 0:
-    print("Fehler:", res.stderr)
+if os.name == "nt":
+    # ein icacls-Aufruf für den ganzen Baum (/T), statt einer pro Datei
+    report = set_owner_windows(pfad, new_owner, recursive=os.path.isdir(pfad))
+else:
+    report = apply_metadata(walk([pfad]), owner=new_owner)
+
+print(f"Owner gesetzt: {report.changed} Einträge")
+for err in report.errors:
+    print("Fehler:", err["path"], err["error"])
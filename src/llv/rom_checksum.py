@@ -0,0 +1,166 @@
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+from llv_utility import COPIER_HEADER
+
+BLOCK = 0x1000  # bytes per Fenwick leaf
+CANONICAL = b"\xff\xff\x00\x00"  # complement/checksum as they are summed: the pair always adds up to 0x1FE
+
+# header offset (without copier header) → map mode byte values that belong there
+_LAYOUTS = (
+    ("LoROM", 0x7FC0, (0x20, 0x30, 0x22, 0x32)),
+    ("HiROM", 0xFFC0, (0x21, 0x31)),
+    ("ExHiROM", 0x40FFC0, (0x25, 0x35)),
+)
+
+
+@dataclass(slots=True)
+class RomHeader:
+    kind: str  # "LoROM", "HiROM" or "ExHiROM"
+    offset: int  # file offset of the internal header ($FFC0 in the first mapped bank)
+
+    @property
+    def checksum_field(self) -> int:
+        """File offset of the complement word; the checksum word follows it."""
+        return self.offset + 0x1C
+
+
+def _score(data, at: int, modes: tuple[int, ...]) -> int:
+    if at + 0x20 > len(data):
+        return -1
+    score = 0
+    complement = data[at + 0x1C] | data[at + 0x1D] << 8
+    checksum = data[at + 0x1E] | data[at + 0x1F] << 8
+    if complement ^ checksum == 0xFFFF:
+        score += 4
+    if data[at + 0x15] in modes:
+        score += 2
+    if all(0x20 <= b < 0x7F for b in data[at:at + 0x15]):
+        score += 1
+    return score
+
+
+def detect_header(data) -> RomHeader | None:
+    """Best-scoring internal header, or None if nothing looks like one."""
+    base = COPIER_HEADER if len(data) % 0x8000 == COPIER_HEADER else 0
+    best, best_score = None, 2  # a valid map mode plus a title, or a matching checksum pair
+    for kind, offset, modes in _LAYOUTS:
+        score = _score(data, base + offset, modes)
+        if score > best_score:
+            best, best_score = RomHeader(kind, base + offset), score
+    return best
+
+
+# ---------------------------------------------------------------------- Fenwick tree
+class Fenwick:
+    """Binary indexed tree over int64 values: point add and prefix sum in O(log n)."""
+
+    def __init__(self, values: np.ndarray):
+        n = len(values)
+        prefix = np.zeros(n + 1, np.int64)
+        np.cumsum(values, out=prefix[1:])
+        i = np.arange(1, n + 1)
+        self._tree = np.zeros(n + 1, np.int64)
+        self._tree[1:] = prefix[1:] - prefix[i - (i & -i)]  # node i covers (i - lowbit(i), i]
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> int:
+        """Sum of the first ``count`` values."""
+        tree = self._tree
+        total = 0
+        i = count
+        while i > 0:
+            total += int(tree[i])
+            i -= i & -i
+        return total
+
+
+# ---------------------------------------------------------------------- checksum
+class ChecksumTracker:
+    """SNES header checksum of a buffer, kept current through byte edits.
+
+    Sums are per BLOCK (or smaller, so every mirror boundary is block
+    aligned); an edit touches O(log n) tree nodes.  The checksum field
+    itself always counts as FF FF 00 00, so writing a new checksum into
+    the header never changes the sum.
+    """
+
+    def __init__(self, data, header: RomHeader):
+        self.header = header
+        self._base = COPIER_HEADER if len(data) % 0x8000 == COPIER_HEADER else 0
+        self.size = len(data) - self._base
+        self._block = max(1, min(BLOCK, self.size & -self.size))
+        raw = np.frombuffer(data, np.uint8)[self._base:]
+        blocks = raw.reshape(-1, self._block).sum(axis=1, dtype=np.int64)
+        field = header.checksum_field - self._base
+        blocks[field // self._block] += sum(CANONICAL) - int(raw[field:field + 4].sum(dtype=np.int64))
+        self._sums = Fenwick(blocks)
+
+    def update(self, offset: int, old, new) -> None:
+        """Account for ``old`` being replaced by ``new`` (same length) at file ``offset``."""
+        rel = offset - self._base
+        delta = np.frombuffer(new, np.uint8).astype(np.int64) - np.frombuffer(old, np.uint8)
+        if rel < 0:  # copier header bytes are not part of the ROM
+            delta, rel = delta[-rel:], 0
+        field = self.header.checksum_field - self._base
+        lo, hi = max(field - rel, 0), min(field + 4 - rel, len(delta))
+        if lo < hi:
+            delta[lo:hi] = 0
+        first = rel // self._block
+        per_block = np.bincount((np.arange(rel, rel + len(delta)) // self._block) - first, weights=delta)
+        for i in np.flatnonzero(per_block).tolist():
+            self._sums.add(first + i, int(per_block[i]))
+
+    def _range(self, start: int, end: int) -> int:
+        return self._sums.prefix(end // self._block) - self._sums.prefix(start // self._block)
+
+    def _mirrored(self, start: int, length: int, fill: int) -> int:
+        """Sum of ``length`` bytes at ``start`` repeated to fill ``fill`` (a power of two) bytes.
+
+        Non-power-of-two images are mirrored the way the hardware sees
+        them: 3 MiB is 2 MiB plus the last 1 MiB twice, 6 MiB is 4 + 2×2.
+        """
+        if length <= 0:
+            return 0
+        part = 1 << (length.bit_length() - 1)
+        if part == length:
+            return self._range(start, start + length) * (fill // length)
+        return (self._range(start, start + part) + self._mirrored(start + part, length - part, part)) * (fill // (2 * part))
+
+    @property
+    def checksum(self) -> int:
+        if not self.size:
+            return 0
+        return self._mirrored(0, self.size, 1 << (self.size - 1).bit_length()) & 0xFFFF
+
+    def stored(self, data) -> int:
+        """Checksum word currently written in the header."""
+        at = self.header.checksum_field
+        return data[at + 2] | data[at + 3] << 8
+
+    def field_bytes(self) -> bytes:
+        """Complement and checksum words to write at ``header.checksum_field``."""
+        value = self.checksum
+        return (value ^ 0xFFFF).to_bytes(2, "little") + value.to_bytes(2, "little")
+
+
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    rom = open(sys.argv[1], "rb").read()
+    found = detect_header(rom)
+    if found is None:
+        sys.exit("no SNES header found")
+    tracker = ChecksumTracker(rom, found)
+    print(f"{found.kind} header at 0x{found.offset:06X}: stored ${tracker.stored(rom):04X}, "
+          f"computed ${tracker.checksum:04X}")
@@ -0,0 +1,177 @@
+import json, struct, sys, time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from llv_utility import COPIER_HEADER
+
+KEY_LEN = 8  # bytes per fingerprint, one little-endian uint64
+LEVEL_MAP = Path(__file__).resolve().parents[2] / "level_map.json"
+LABELS_PATH = Path.home() / ".filedump" / "labels.json"
+
+
+@dataclass(slots=True)
+class KnownRegion:
+    """A block of bytes we know the meaning of, at its documented ROM offset."""
+
+    label: str
+    offset: int  # headerless ROM offset
+    data: bytes
+    source: str = "user"  # "level map" or "user"
+
+
+@dataclass(slots=True)
+class Match:
+    offset: int  # file offset where the content was found
+    expected: int  # file offset the region is documented at
+    region: KnownRegion
+    duplicates: int = 0  # other known regions with identical content
+
+    @property
+    def relocated(self) -> bool:
+        return self.offset != self.expected
+
+
+def rom_header_size(data: bytes | bytearray) -> int:
+    """512 if the file still carries a copier header, else 0."""
+    return COPIER_HEADER if len(data) % 0x8000 == COPIER_HEADER else 0
+
+
+# ---------------------------------------------------------------------- sources
+def regions_from_level_map(path: Path = LEVEL_MAP) -> list[KnownRegion]:
+    """Room PLM lists from ``requester.parse_bank_8f`` output, rebuilt as raw bytes.
+
+    Each entry is 6 bytes (id, x, y, param; words little-endian) and the
+    list ends with a 0000 terminator.  Rooms whose entries are not
+    contiguous are split into runs so every region is exact.
+    """
+    try:
+        with open(path, encoding="utf-8") as fp:
+            rooms = json.load(fp)
+    except (OSError, ValueError):
+        return []
+
+    regions = []
+    for room in rooms:
+        label = room["description"].lstrip("; ") or f"PLMs at {room['base_lorom']}"
+        runs: list[tuple[int, bytearray]] = []
+        for plm in room["plms"]:
+            off = int(plm["file_offset"], 16)
+            entry = struct.pack("<HBBH", int(plm["id"], 16), plm["x"], plm["y"], int(plm["param"], 16))
+            if runs and runs[-1][0] + len(runs[-1][1]) == off:
+                runs[-1][1].extend(entry)
+            else:
+                runs.append((off, bytearray(entry)))
+        if runs:
+            runs[-1][1].extend(b"\x00\x00")  # terminator follows the last entry
+        for off, blob in runs:
+            if len(blob) >= KEY_LEN:
+                regions.append(KnownRegion(label, off, bytes(blob), "level map"))
+    return regions
+
+
+def load_user_labels(path: Path = LABELS_PATH) -> list[KnownRegion]:
+    try:
+        with open(path, encoding="utf-8") as fp:
+            entries = json.load(fp)
+    except (OSError, ValueError):
+        return []
+    return [KnownRegion(e["label"], e["offset"], bytes.fromhex(e["data"]), "user") for e in entries]
+
+
+def save_user_label(region: KnownRegion, path: Path = LABELS_PATH) -> None:
+    """Append one labelled region; the bytes are stored so it is found in other ROMs too."""
+    entries = [{"label": r.label, "offset": r.offset, "data": r.data.hex()} for r in load_user_labels(path)]
+    entries.append({"label": region.label, "offset": region.offset, "data": region.data.hex()})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(entries, fp, indent=2, ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------- index
+def _anchor(blob: bytes) -> int:
+    """First 8-byte window that is not a plain fill, so the key stays selective."""
+    for i in range(len(blob) - KEY_LEN + 1):
+        if blob[i:i + KEY_LEN].count(blob[i]) != KEY_LEN:
+            return i
+    return 0
+
+
+class RomIndex:
+    """Fingerprint index of known regions.
+
+    Every distinct region content is keyed by one 8-byte window.  A scan
+    reads the ROM as eight uint64 views (one per byte phase, no copies),
+    finds candidate positions with one ``searchsorted`` per view and only
+    then compares full contents, so regions are found wherever they sit.
+    """
+
+    def __init__(self, regions: list[KnownRegion]):
+        self.regions = list(regions)
+        by_content: dict[bytes, list[KnownRegion]] = {}
+        for region in self.regions:
+            by_content.setdefault(region.data, []).append(region)
+
+        self._by_key: dict[int, list[tuple[int, bytes, list[KnownRegion]]]] = {}
+        for blob, group in by_content.items():
+            anchor = _anchor(blob)
+            key = int.from_bytes(blob[anchor:anchor + KEY_LEN], "little")
+            self._by_key.setdefault(key, []).append((anchor, blob, group))
+        self._keys = np.array(sorted(self._by_key), dtype=np.uint64)
+
+    @classmethod
+    def load(cls) -> "RomIndex":
+        """Level map plus the user's labels."""
+        return cls(regions_from_level_map() + load_user_labels())
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def scan(self, data: bytes | bytearray, header: int | None = None) -> list[Match]:
+        """All known regions present in ``data``, sorted by offset."""
+        if header is None:
+            header = rom_header_size(data)
+        n = len(data)
+        if n < KEY_LEN or not len(self._keys):
+            return []
+
+        positions, keys = [], []
+        for phase in range(KEY_LEN):
+            count = (n - phase) // KEY_LEN
+            if count <= 0:
+                continue
+            words = np.frombuffer(data, dtype="<u8", count=count, offset=phase)
+            slot = np.searchsorted(self._keys, words)
+            slot[slot == len(self._keys)] = 0
+            hit = np.flatnonzero(self._keys[slot] == words)
+            positions.append(hit * KEY_LEN + phase)
+            keys.append(words[hit])
+        positions = np.concatenate(positions)
+        keys = np.concatenate(keys)
+
+        view = memoryview(data)
+        matches: dict[tuple[int, int], Match] = {}
+        for pos, key in zip(positions.tolist(), keys.tolist()):
+            for anchor, blob, group in self._by_key[key]:
+                start = pos - anchor
+                if start < 0 or view[start:start + len(blob)] != blob:
+                    continue
+                region = next((r for r in group if r.offset + header == start), group[0])
+                matches[(start, id(blob))] = Match(start, region.offset + header, region, len(group) - 1)
+        return sorted(matches.values(), key=lambda m: m.offset)
+
+
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    rom = Path(sys.argv[1]).read_bytes()
+    t0 = time.perf_counter()
+    index = RomIndex.load()
+    t1 = time.perf_counter()
+    found = index.scan(rom)
+    t2 = time.perf_counter()
+    for m in found:
+        moved = f"  (documented at 0x{m.expected:06X})" if m.relocated else ""
+        print(f"0x{m.offset:06X}  {m.region.label}{moved}")
+    print(f"{len(found)} matches from {len(index)} regions; "
+          f"index {1000 * (t1 - t0):.0f} ms, scan {1000 * (t2 - t1):.0f} ms", file=sys.stderr)
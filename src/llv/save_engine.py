@@ -0,0 +1,163 @@
+import os, shutil, struct, tempfile, zlib
+from dataclasses import dataclass
+
+MAGIC = b"FDWAL\x00\x01\x00"
+COMMIT = b"FDCOMMIT"
+_ENTRY = struct.Struct("<QII")  # offset, length, crc32 of data
+_TRAILER = struct.Struct("<II")  # entry count, crc32 over all entry crcs
+
+
+@dataclass
+class SaveResult:
+    mode: str  # "journal" (patched in place) or "replace" (temp file + rename)
+    written: int  # payload bytes written to the target
+
+
+def journal_path(path: str) -> str:
+    return path + ".wal"
+
+
+def _fsync_dir(path: str) -> None:
+    """Make a create/rename/unlink in ``path``'s directory durable (no-op on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def coalesce(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sorted, merged (start, end) ranges; touching ranges are joined."""
+    out: list[list[int]] = []
+    for start, end in sorted(ranges):
+        if out and start <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], end)
+        else:
+            out.append([start, end])
+    return [(s, e) for s, e in out]
+
+
+# ---------------------------------------------------------------------- journal
+def _write_journal(path: str, patches: list[tuple[int, bytes]]) -> None:
+    crcs = []
+    with open(journal_path(path), "wb") as fp:
+        fp.write(MAGIC)
+        for offset, data in patches:
+            crc = zlib.crc32(data)
+            crcs.append(crc)
+            fp.write(_ENTRY.pack(offset, len(data), crc))
+            fp.write(data)
+        fp.write(COMMIT + _TRAILER.pack(len(patches), zlib.crc32(struct.pack(f"<{len(crcs)}I", *crcs))))
+        fp.flush()
+        os.fsync(fp.fileno())
+    _fsync_dir(path)
+
+
+def _read_journal(path: str) -> list[tuple[int, bytes]] | None:
+    """Patches of a committed journal, or None if it is torn or corrupt."""
+    try:
+        with open(journal_path(path), "rb") as fp:
+            blob = fp.read()
+    except OSError:
+        return None
+    if not blob.startswith(MAGIC):
+        return None
+    pos = len(MAGIC)
+    patches, crcs = [], []
+    while blob[pos:pos + len(COMMIT)] != COMMIT:
+        if pos + _ENTRY.size > len(blob):
+            return None
+        offset, length, crc = _ENTRY.unpack_from(blob, pos)
+        pos += _ENTRY.size
+        data = blob[pos:pos + length]
+        if len(data) != length or zlib.crc32(data) != crc:
+            return None
+        patches.append((offset, data))
+        crcs.append(crc)
+        pos += length
+    pos += len(COMMIT)
+    if pos + _TRAILER.size != len(blob):
+        return None
+    count, total = _TRAILER.unpack_from(blob, pos)
+    if count != len(patches) or total != zlib.crc32(struct.pack(f"<{len(crcs)}I", *crcs)):
+        return None
+    return patches
+
+
+def _apply(path: str, patches: list[tuple[int, bytes]]) -> int:
+    written = 0
+    with open(path, "rb+") as fp:
+        for offset, data in patches:
+            fp.seek(offset)
+            fp.write(data)
+            written += len(data)
+        fp.flush()
+        os.fsync(fp.fileno())
+    return written
+
+
+def _drop_journal(path: str) -> None:
+    os.remove(journal_path(path))
+    _fsync_dir(path)
+
+
+def save_patches(path: str, patches: list[tuple[int, bytes]]) -> SaveResult:
+    """Write same-size patches durably: journal → fsync → apply in place → fsync → drop journal.
+
+    If we die before the journal's commit record is on disk the file is
+    untouched; after it, ``recover`` finishes the job on the next open.
+    """
+    _write_journal(path, patches)
+    written = _apply(path, patches)
+    _drop_journal(path)
+    return SaveResult("journal", written)
+
+
+def recover(path: str) -> int | None:
+    """Finish or discard a journal left by an interrupted save.
+
+    Returns the number of patches re-applied, 0 if an uncommitted journal
+    was discarded, or None if there was nothing to recover.
+    """
+    if not os.path.exists(journal_path(path)):
+        return None
+    patches = _read_journal(path)
+    if patches:
+        _apply(path, patches)  # idempotent: same bytes at the same offsets
+    _drop_journal(path)
+    return len(patches) if patches else 0
+
+
+# ---------------------------------------------------------------------- full rewrite
+def replace_file(path: str, data) -> SaveResult:
+    """Write ``data`` to a temp file next to ``path`` and rename it over the original."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+            fp.flush()
+            os.fsync(fp.fileno())
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _fsync_dir(path)
+    return SaveResult("replace", len(data))
+
+
+def save(path: str, data, dirty: list[tuple[int, int]] | None, old_size: int) -> SaveResult:
+    """Persist ``data`` to ``path`` at a cost proportional to what changed.
+
+    ``dirty`` lists the byte ranges that may differ from the file on disk.
+    Same-size edits go through the journal; a size change, or unknown
+    dirty ranges, rewrites the file atomically instead.
+    """
+    if dirty is None or len(data) != old_size:
+        return replace_file(path, data)
+    view = memoryview(data)
+    return save_patches(path, [(s, bytes(view[s:e])) for s, e in coalesce(dirty)])
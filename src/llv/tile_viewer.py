@@ -0,0 +1,159 @@
+from collections import OrderedDict
+
+import numpy as np
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from common import perf
+
+TILE = 8  # pixels per tile side
+PAGE_ROWS = 32  # tile rows decoded (and cached) together
+
+
+def tile_bytes(bpp: int) -> int:
+    return 8 * bpp
+
+
+def decode_tiles(data, bpp: int) -> np.ndarray:
+    """SNES planar tiles → (n, 8, 8) array of color indices.
+
+    Each tile stores its bitplanes in pairs: for every pair, 8 rows of
+    (plane 2k, plane 2k+1) bytes; 2bpp has one pair, 4bpp two, 8bpp four.
+    """
+    size = tile_bytes(bpp)
+    raw = np.frombuffer(data, np.uint8, count=len(data) // size * size)
+    pairs = raw.reshape(-1, bpp // 2, TILE, 2)  # tile, pair, row, plane in pair
+    planes = pairs.transpose(0, 2, 1, 3).reshape(-1, TILE, bpp)  # tile, row, plane
+    bits = np.unpackbits(planes[..., None], axis=-1)  # tile, row, plane, x (msb = left)
+    return np.packbits(bits.transpose(0, 1, 3, 2), axis=-1, bitorder="little")[..., 0]
+
+
+def tile_sheet(tiles: np.ndarray, per_row: int) -> np.ndarray:
+    """Lay (n, 8, 8) tiles out left to right, ``per_row`` per row (missing tiles stay 0)."""
+    rows = -(-len(tiles) // per_row)
+    padded = np.zeros((rows * per_row, TILE, TILE), np.uint8)
+    padded[:len(tiles)] = tiles
+    return np.ascontiguousarray(
+        padded.reshape(rows, per_row, TILE, TILE).transpose(0, 2, 1, 3).reshape(rows * TILE, per_row * TILE)
+    )
+
+
+def grey_palette(bpp: int) -> list[int]:
+    levels = 1 << min(bpp, 8)
+    return [QtGui.qRgb(v, v, v) for v in (i * 255 // (levels - 1) for i in range(levels))]
+
+
+def snes_palette(data, offset: int, bpp: int) -> list[int]:
+    """2**bpp BGR555 colors read from ``data[offset:]``."""
+    count = 1 << min(bpp, 8)
+    words = np.frombuffer(bytes(data[offset:offset + 2 * count]).ljust(2 * count, b"\0"), "<u2")
+    r, g, b = ((words >> s) & 0x1F for s in (0, 5, 10))
+    return [QtGui.qRgb(int(r[i]) << 3, int(g[i]) << 3, int(b[i]) << 3) for i in range(count)]
+
+
+class TileView(QtWidgets.QAbstractScrollArea):
+    """Scrollable sheet of SNES tiles starting at ``offset`` in a byte buffer.
+
+    Only the pages under the viewport are decoded; each page is one
+    Indexed8 QImage sharing memory with its NumPy array and is kept in a
+    small LRU, so scrolling back and forth does no decoding at all.
+    """
+
+    def __init__(self, parent=None, cache_pages: int = 64):
+        super().__init__(parent)
+        self._data = b""
+        self.offset = 0
+        self.bpp = 4
+        self.per_row = 16
+        self.zoom = 2
+        self._palette = grey_palette(self.bpp)
+        self._pages: OrderedDict[int, tuple[QtGui.QImage, np.ndarray]] = OrderedDict()
+        self._capacity = cache_pages
+        self.viewport().setAttribute(QtCore.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+
+    # ------------------------------------------------------------------ settings
+    def set_data(self, data) -> None:
+        self._data = data
+        self._reset()
+
+    def configure(self, offset: int | None = None, bpp: int | None = None, per_row: int | None = None,
+                  zoom: int | None = None, palette: list[int] | None = None) -> None:
+        if offset is not None:
+            self.offset = max(0, offset)
+        if bpp is not None:
+            self.bpp = bpp
+        if per_row is not None:
+            self.per_row = max(1, per_row)
+        if zoom is not None:
+            self.zoom = max(1, zoom)
+        self._palette = palette or grey_palette(self.bpp)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pages.clear()
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, self._tile_rows() - 1))
+        bar.setPageStep(max(1, self._visible_rows() - 1))
+        self.viewport().update()
+
+    def _tile_rows(self) -> int:
+        tiles = max(0, len(self._data) - self.offset) // tile_bytes(self.bpp)
+        return -(-tiles // self.per_row)
+
+    def _visible_rows(self) -> int:
+        return self.viewport().height() // (TILE * self.zoom) + 1
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.verticalScrollBar().setPageStep(max(1, self._visible_rows() - 1))
+
+    def offset_at(self, pos: QtCore.QPoint) -> int | None:
+        """File offset of the tile under a viewport position."""
+        col = pos.x() // (TILE * self.zoom)
+        row = self.verticalScrollBar().value() + pos.y() // (TILE * self.zoom)
+        if col >= self.per_row:
+            return None
+        off = self.offset + (row * self.per_row + col) * tile_bytes(self.bpp)
+        return off if off < len(self._data) else None
+
+    # ------------------------------------------------------------------ pages
+    def _page(self, index: int) -> QtGui.QImage:
+        hit = self._pages.get(index)
+        if hit is not None:
+            self._pages.move_to_end(index)
+            return hit[0]
+        with perf.scope("tile page decode", "filedump"):
+            span = PAGE_ROWS * self.per_row * tile_bytes(self.bpp)
+            start = self.offset + index * span
+            sheet = tile_sheet(decode_tiles(memoryview(self._data)[start:start + span], self.bpp), self.per_row)
+            image = QtGui.QImage(sheet.data, sheet.shape[1], sheet.shape[0], sheet.strides[0],
+                                 QtGui.QImage.Format.Format_Indexed8)
+            image.setColorTable(self._palette)
+        self._pages[index] = (image, sheet)  # the array owns the pixels the image points at
+        if len(self._pages) > self._capacity:
+            self._pages.popitem(last=False)
+        return image
+
+    # ------------------------------------------------------------------ painting
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().window())
+        rows = self._tile_rows()
+        if not rows:
+            return
+        scale = TILE * self.zoom
+        first = self.verticalScrollBar().value()
+        last = min(rows, first + self._visible_rows())
+        row = first
+        while row < last:
+            page, in_page = divmod(row, PAGE_ROWS)
+            take = min(PAGE_ROWS - in_page, last - row)
+            image = self._page(page)
+            take = min(take, image.height() // TILE - in_page)
+            if take <= 0:
+                break
+            source = QtCore.QRect(0, in_page * TILE, image.width(), take * TILE)
+            target = QtCore.QRect(0, (row - first) * scale, image.width() * self.zoom, take * scale)
+            painter.drawImage(target, image, source)
+            row += take
+        perf.count("tile rows painted", last - first)
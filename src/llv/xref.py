@@ -0,0 +1,144 @@
+import hashlib, os, sys, tempfile, time, zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from llv_utility import COPIER_HEADER
+
+XREF_DIR = Path.home() / ".filedump" / "xref"
+XREF_CACHE_BYTES = 256 << 20  # least recently used index files beyond this are deleted
+FORMAT_VERSION = 1
+
+SHORT = 2  # 16-bit pointer, resolved in the bank it sits in
+LONG = 3  # 24-bit pointer
+
+
+@dataclass
+class XrefIndex:
+    """Reverse pointer index: for every plausible pointer, where it points and where it sits.
+
+    ``targets`` is sorted, so the references to one offset are a single
+    ``searchsorted`` range.
+    """
+
+    targets: np.ndarray  # uint32 file offsets pointed at, sorted
+    sources: np.ndarray  # uint32 file offsets of the pointer bytes
+    kinds: np.ndarray  # uint8 SHORT or LONG
+
+    @classmethod
+    def build(cls, data, header: int | None = None) -> "XrefIndex":
+        """One pass over strided byte views of ``data``; LoROM mapping as in ``lorom_to_pc``."""
+        a = np.frombuffer(data, np.uint8)
+        n = len(a)
+        if header is None:
+            header = COPIER_HEADER if n % 0x8000 == COPIER_HEADER else 0
+        rom_size = n - header
+        if n < 3:
+            empty = np.empty(0, np.uint32)
+            return cls(empty, empty, np.empty(0, np.uint8))
+
+        lo, mid, hi = a[:-2].astype(np.uint32), a[1:-1].astype(np.uint32), a[2:].astype(np.uint32)
+        addr = lo | (mid << 8)  # 16-bit value at every offset (but the last two)
+        pos = np.arange(n - 2, dtype=np.uint32)
+        in_rom = pos >= header
+
+        # 16-bit: $8000-$FFFF within the bank holding the pointer itself
+        short = in_rom & (addr >= 0x8000)
+        short_src = pos[short]
+        short_tgt = (((short_src - header) >> 15) << 15 | (addr[short] & 0x7FFF)) + header
+
+        # 24-bit: ROM banks $00-$7D and $80-$FF, upper half of the bank
+        long_ = in_rom & (addr >= 0x8000) & ((hi < 0x7E) | (hi >= 0x80))
+        long_tgt = ((hi[long_] & 0x7F) << 15 | (addr[long_] & 0x7FFF))
+        keep = long_tgt < rom_size
+        long_src = pos[long_][keep]
+        long_tgt = long_tgt[keep] + header
+
+        targets = np.concatenate([short_tgt, long_tgt])
+        sources = np.concatenate([short_src, long_src])
+        kinds = np.concatenate([np.full(len(short_src), SHORT, np.uint8), np.full(len(long_src), LONG, np.uint8)])
+        order = np.argsort(targets, kind="stable")
+        return cls(targets[order], sources[order], kinds[order])
+
+    @classmethod
+    def load_or_build(cls, data, cache_dir: Path = XREF_DIR, max_bytes: int = XREF_CACHE_BYTES) -> "XrefIndex":
+        """Index for ``data``, from ``cache_dir/<sha1>.npz`` when this exact content was indexed before.
+
+        Every saved version of a file gets its own cache entry; once they
+        add up to more than ``max_bytes`` the least recently used go.
+        """
+        path = cache_dir / f"{hashlib.sha1(data).hexdigest()}.npz"
+        index = None
+        try:
+            with np.load(path) as npz:
+                if int(npz["version"]) == FORMAT_VERSION:
+                    index = cls(npz["targets"], npz["sources"], npz["kinds"])
+        except FileNotFoundError:
+            pass
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+            path.unlink(missing_ok=True)  # torn or foreign file: rebuild and replace it
+        if index is not None:
+            try:
+                os.utime(path)  # mtime doubles as the last use for eviction
+            except OSError:
+                pass
+            return index
+        index = cls.build(data)
+        try:
+            index._save(path)
+            _evict(cache_dir, max_bytes)
+        except OSError:
+            pass  # a read-only home only costs the rebuild next time
+        return index
+
+    def _save(self, path: Path) -> None:
+        """Write to a temp file next to ``path`` and rename it in, so a crash never leaves half a cache."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=path.stem + ".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                np.savez(fp, version=FORMAT_VERSION, targets=self.targets, sources=self.sources, kinds=self.kinds)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def references(self, offset: int) -> list[tuple[int, int]]:
+        """(source offset, SHORT/LONG) of every pointer to ``offset``, O(log n) + hits."""
+        key = np.uint32(offset)  # a Python int would promote (and copy) the whole array
+        lo = np.searchsorted(self.targets, key, "left")
+        hi = np.searchsorted(self.targets, key, "right")
+        return list(zip(self.sources[lo:hi].tolist(), self.kinds[lo:hi].tolist()))
+
+
+def _evict(cache_dir: Path, max_bytes: int) -> None:
+    """Delete the least recently used index files until the rest fit in ``max_bytes``."""
+    entries = []
+    for path in cache_dir.glob("*.npz"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue  # another process evicted it first
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort(reverse=True)
+    total = 0
+    for _, size, path in entries:
+        total += size
+        if total > max_bytes:
+            path.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------
+if __name__ == "__main__":
+    rom = Path(sys.argv[1]).read_bytes()
+    t0 = time.perf_counter()
+    index = XrefIndex.load_or_build(rom)
+    t1 = time.perf_counter()
+    target = int(sys.argv[2], 16)
+    for src, kind in index.references(target):
+        print(f"0x{src:06X}  {'long' if kind == LONG else 'short'}")
+    print(f"{len(index):,} pointers indexed in {t1 - t0:.2f}s", file=sys.stderr)
@@ -0,0 +1,209 @@
+# src/pongTest/gameloop.py
+"""Fixed-timestep 2D game loop with vectorised circle-vs-box physics.
+
+Nothing here imports Kivy: the window drives ``FixedStepLoop.advance``
+from ``Clock`` (see main.py), tests and benchmarks drive it with
+``run_headless``.
+"""
+import sys, time
+from collections.abc import Callable
+
+import numpy as np
+
+_FACE_NORMALS = np.array([[-1.0, 0.0], [1.0, 0.0], [0.0, -1.0], [0.0, 1.0]])  # left, right, bottom, top
+
+
+class FixedStepLoop:
+    """Accumulator that runs ``step(dt)`` at a fixed rate, whatever the frame rate.
+
+    ``advance`` returns the interpolation factor (0..1) between the last
+    two simulated states for rendering.  At most ``max_steps`` steps run
+    per frame, so a long stall does not snowball into ever longer frames.
+    """
+
+    def __init__(self, step: Callable[[float], None], dt: float = 1 / 120, max_steps: int = 8):
+        self.step = step
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    def advance(self, frame_dt: float) -> float:
+        self.accumulator += min(frame_dt, self.dt * self.max_steps)
+        while self.accumulator >= self.dt:
+            self.step(self.dt)
+            self.accumulator -= self.dt
+            self.ticks += 1
+        return self.accumulator / self.dt
+
+
+def swept_circle_boxes(pos: np.ndarray, vel: np.ndarray, radius: np.ndarray, boxes: np.ndarray,
+                       dt: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Earliest hit of each moving circle against a set of boxes within ``dt``.
+
+    pos/vel are (n, 2), radius (n,), boxes (m, 4) as x0, y0, x1, y1.  Each
+    box is grown by the circle's radius and intersected with the motion
+    ray (slab test), all n×m pairs at once.  Returns (hit mask (n,),
+    time of impact (n,), surface normal (n, 2)).
+    """
+    n = len(pos)
+    if not len(boxes) or not n:
+        return np.zeros(n, bool), np.full(n, np.inf), np.zeros((n, 2))
+    r = radius[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / vel  # ±inf on a zero component: that slab is then either always or never entered
+        t_lo = []
+        t_hi = []
+        for axis in (0, 1):
+            near = (boxes[None, :, axis] - r - pos[:, None, axis]) * inv[:, None, axis]
+            far = (boxes[None, :, axis + 2] + r - pos[:, None, axis]) * inv[:, None, axis]
+            t_lo.append(np.fmin(near, far))
+            t_hi.append(np.fmax(near, far))
+    enter = np.maximum(t_lo[0], t_lo[1])  # (n, m)
+    leave = np.minimum(t_hi[0], t_hi[1])
+    hits = (enter <= leave) & (enter >= 0) & (enter <= dt)
+    toi = np.where(hits, enter, np.inf)
+    first = toi.argmin(axis=1)
+    rows = np.arange(n)
+    t = toi[rows, first]
+    hit = np.isfinite(t)
+
+    normal = np.zeros((n, 2))
+    x_face = t_lo[0][rows, first] >= t_lo[1][rows, first]
+    normal[:, 0] = np.where(x_face, -np.sign(vel[:, 0]), 0.0)
+    normal[:, 1] = np.where(x_face, 0.0, -np.sign(vel[:, 1]))
+    normal[~hit] = 0.0
+    return hit, t, normal
+
+
+def push_out_circles(pos: np.ndarray, vel: np.ndarray, radius: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Move circles that already overlap a box out through its nearest face, in place.
+
+    The sweep only finds surfaces ahead of a circle, so one that starts a
+    step inside a box (a paddle moved onto the ball) would pass through.
+    Such circles are pushed out along the axis of least penetration and,
+    if heading inwards, reflected off that face.  Returns the mask of
+    circles that were moved.
+    """
+    n = len(pos)
+    if not len(boxes) or not n:
+        return np.zeros(n, bool)
+    r = radius[:, None]
+    x, y = pos[:, None, 0], pos[:, None, 1]
+    inside = ((x > boxes[None, :, 0] - r) & (x < boxes[None, :, 2] + r)
+              & (y > boxes[None, :, 1] - r) & (y < boxes[None, :, 3] + r))  # (n, m)
+    moved = inside.any(axis=1)
+    rows = np.flatnonzero(moved)
+    if not len(rows):
+        return moved
+    box = boxes[inside[rows].argmax(axis=1)]  # first box each of them overlaps
+    px, py, pr = pos[rows, 0], pos[rows, 1], radius[rows]
+    d = np.column_stack([px - (box[:, 0] - pr), box[:, 2] + pr - px, py - (box[:, 1] - pr), box[:, 3] + pr - py])
+    face = d.argmin(axis=1)
+    normal = _FACE_NORMALS[face]
+    pos[rows] += normal * d[np.arange(len(rows)), face][:, None]
+    along = (vel[rows] * normal).sum(axis=1, keepdims=True)
+    vel[rows] -= 2 * np.minimum(along, 0) * normal
+    return moved
+
+
+class World:
+    """Circles bouncing between the top and bottom edge and off axis-aligned boxes (paddles).
+
+    Bodies are stored as arrays, one row per body; ``prev`` is the state
+    before the last step, for ``interpolated``.  Bodies leaving through
+    the left or right edge are reported by ``step`` (that is a point in Pong).
+    """
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self.pos = np.zeros((0, 2))
+        self.prev = self.pos.copy()
+        self.vel = np.zeros((0, 2))
+        self.radius = np.zeros(0)
+        self.boxes = np.zeros((0, 4))
+
+    def add_bodies(self, pos, vel, radius) -> np.ndarray:
+        """Append bodies; returns their indices."""
+        pos = np.asarray(pos, float).reshape(-1, 2)
+        first = len(self.pos)
+        self.pos = np.vstack([self.pos, pos])
+        self.prev = np.vstack([self.prev, pos])
+        self.vel = np.vstack([self.vel, np.asarray(vel, float).reshape(-1, 2)])
+        self.radius = np.concatenate([self.radius, np.broadcast_to(np.asarray(radius, float), len(pos))])
+        return np.arange(first, len(self.pos))
+
+    def step(self, dt: float) -> tuple[np.ndarray, np.ndarray]:
+        """Advance every body by ``dt``; returns the indices that left on the left and right."""
+        self.prev[:] = self.pos
+        push_out_circles(self.pos, self.vel, self.radius, self.boxes)
+        hit, t, normal = swept_circle_boxes(self.pos, self.vel, self.radius, self.boxes, dt)
+
+        # move to the contact point, reflect, and spend the rest of the step on the new heading
+        t = np.where(hit, t, dt)[:, None]
+        self.pos += self.vel * t
+        along = (self.vel * normal).sum(axis=1, keepdims=True)
+        self.vel -= 2 * along * normal
+        self.pos += self.vel * (dt - t)
+
+        # top and bottom edges are mirrors
+        r = self.radius
+        y, vy = self.pos[:, 1], self.vel[:, 1]
+        low, high = y < r, y > self.height - r
+        y[low] = 2 * r[low] - y[low]
+        y[high] = 2 * (self.height - r[high]) - y[high]
+        vy[low | high] *= -1
+
+        x = self.pos[:, 0]
+        return np.flatnonzero(x < -r), np.flatnonzero(x > self.width + r)
+
+    def interpolated(self, alpha: float) -> np.ndarray:
+        """Positions between the last two steps, for drawing."""
+        return self.prev + (self.pos - self.prev) * alpha
+
+    def respawn(self, index: np.ndarray, speed: float, rng: np.random.Generator) -> None:
+        """Put bodies back in the centre, heading randomly left or right."""
+        if not len(index):
+            return
+        angle = rng.uniform(-np.pi / 4, np.pi / 4, len(index)) + rng.integers(0, 2, len(index)) * np.pi
+        self.pos[index] = (self.width / 2, self.height / 2)
+        self.prev[index] = self.pos[index]
+        self.vel[index] = np.column_stack([np.cos(angle), np.sin(angle)]) * speed
+
+
+# ---------------------------------------------------------------------- headless
+def run_headless(world: World, seconds: float, dt: float = 1 / 120, frame_dt: float = 1 / 60,
+                 on_exit: Callable[[np.ndarray, np.ndarray], None] | None = None) -> FixedStepLoop:
+    """Simulate ``seconds`` of game time without a window, fed with synthetic frame times."""
+    def step(h: float) -> None:
+        left, right = world.step(h)
+        if on_exit is not None:
+            on_exit(left, right)
+
+    loop = FixedStepLoop(step, dt)
+    for _ in range(round(seconds / frame_dt)):
+        loop.advance(frame_dt)
+    return loop
+
+
+def benchmark(bodies: int = 5000, seconds: float = 5.0, seed: int = 0) -> float:
+    """Body updates per wall-clock second for ``bodies`` balls in a Pong court."""
+    rng = np.random.default_rng(seed)
+    world = World(800, 600)
+    world.boxes = np.array([[20, 250, 30, 350], [770, 250, 780, 350],  # paddles
+                            [300, 60, 320, 160], [480, 440, 500, 540]], float)  # obstacles
+    index = world.add_bodies(np.zeros((bodies, 2)), np.zeros((bodies, 2)), 6)
+    world.respawn(index, 400, rng)
+    world.pos += rng.uniform(-200, 200, world.pos.shape)
+
+    start = time.perf_counter()
+    loop = run_headless(world, seconds, on_exit=lambda l, r: world.respawn(np.concatenate([l, r]), 400, rng))
+    elapsed = time.perf_counter() - start
+    print(f"{bodies} bodies, {loop.ticks} ticks in {elapsed:.2f}s: "
+          f"{loop.ticks / elapsed:.0f} ticks/s, {bodies * loop.ticks / elapsed / 1e6:.1f}M body updates/s")
+    return bodies * loop.ticks / elapsed
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -1,13 +1,79 @@
 # src/aquabuddy/main.py
+import numpy as np
 from kivy.app import App
+from kivy.clock import Clock
+from kivy.graphics import Color, Ellipse, Rectangle
+from kivy.properties import NumericProperty
 from kivy.uix.widget import Widget
 
+from gameloop import FixedStepLoop, World
+
+PADDLE_W, PADDLE_H = 10, 100
+BALL_R = 8
+BALL_SPEED = 400
+
+
 class PongGame(Widget):
-    pass
+    """Pong on top of the fixed-step World; Clock only drives the loop and the drawing."""
+
+    player1_score = NumericProperty(0)
+    player2_score = NumericProperty(0)
+
+    def __init__(self, balls: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.world = World(self.width, self.height)
+        self.rng = np.random.default_rng()
+        self.world.add_bodies(np.zeros((balls, 2)), np.zeros((balls, 2)), BALL_R)
+        self.loop = FixedStepLoop(self._step)
+        self.paddles = [self.height / 2, self.height / 2]  # centre y of left and right paddle
+
+        with self.canvas:
+            Color(1, 1, 1)
+            self._paddle_rects = [Rectangle(size=(PADDLE_W, PADDLE_H)) for _ in range(2)]
+            self._ball_shapes = [Ellipse(size=(2 * BALL_R, 2 * BALL_R)) for _ in range(balls)]
+        self.bind(size=self._resize)
+        Clock.schedule_interval(self.tick, 0)  # every frame; the loop decides how many steps to run
+
+    def _resize(self, *_) -> None:
+        self.world.width, self.world.height = self.width, self.height
+        self.paddles = [self.height / 2, self.height / 2]
+        self._place_paddles()
+        self.world.respawn(np.arange(len(self.world.pos)), BALL_SPEED, self.rng)
+
+    def _place_paddles(self) -> None:
+        left, right = self.paddles
+        self.world.boxes = np.array([
+            [20, left - PADDLE_H / 2, 20 + PADDLE_W, left + PADDLE_H / 2],
+            [self.width - 20 - PADDLE_W, right - PADDLE_H / 2, self.width - 20, right + PADDLE_H / 2],
+        ], float)
+
+    # ------------------------------------------------------------------ simulation
+    def _step(self, dt: float) -> None:
+        left, right = self.world.step(dt)
+        self.player2_score += len(left)
+        self.player1_score += len(right)
+        self.world.respawn(np.concatenate([left, right]), BALL_SPEED, self.rng)
+
+    def on_touch_move(self, touch):
+        if touch.x < self.width / 3:
+            self.paddles[0] = touch.y
+        elif touch.x > self.width * 2 / 3:
+            self.paddles[1] = touch.y
+        self._place_paddles()
+        return super().on_touch_move(touch)
+
+    # ------------------------------------------------------------------ rendering
+    def tick(self, frame_dt: float) -> None:
+        alpha = self.loop.advance(frame_dt)
+        for shape, (x, y) in zip(self._ball_shapes, self.world.interpolated(alpha).tolist()):
+            shape.pos = (x - BALL_R, y - BALL_R)
+        for rect, (x0, y0, _, _) in zip(self._paddle_rects, self.world.boxes.tolist()):
+            rect.pos = (x0, y0)
+
 
 class PongApp(App):
     def build(self):
         return PongGame()
 
 if __name__ == "__main__":
-    PongApp().run()
\ No newline at end of file
+    PongApp().run()
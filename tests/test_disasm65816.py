@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "llv"))  # the llv modules import each other flat
+
+from disasm65816 import MNEMONIC, MODE, decode_block
+
+
+def test_ora_row_neighbours():
+    # rows $00 and $10 interleave TSB/TRB with ORA in the dp and abs columns
+    assert (MNEMONIC[0x04], MODE[0x04]) == ("TSB", "dp")
+    assert (MNEMONIC[0x0C], MODE[0x0C]) == ("TSB", "abs")
+    assert (MNEMONIC[0x14], MODE[0x14]) == ("TRB", "dp")
+    assert (MNEMONIC[0x1C], MODE[0x1C]) == ("TRB", "abs")
+
+
+def test_ora_opcodes():
+    ora = {op for op in range(0x20) if MNEMONIC[op] == "ORA"}
+    assert ora == {0x01, 0x03, 0x05, 0x07, 0x09, 0x0D, 0x0F, 0x11, 0x12, 0x13, 0x15, 0x17, 0x19, 0x1D, 0x1F}
+    assert len({MODE[op] for op in ora}) == len(ora)  # one opcode per addressing mode
+
+
+def test_decode_tsb_abs():
+    (ins,) = decode_block(b"\x0C\x34\x12", 0, True, True).instructions
+    assert (ins.mnemonic, ins.operand) == ("TSB", "$1234")